@@ -4,9 +4,15 @@ Authentication utilities for Lead Scoring API
 This module provides JWT token handling and user authentication utilities.
 """
 
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
-from fastapi import HTTPException, status
+from typing import Dict, Any, Optional, Tuple
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
@@ -15,16 +21,75 @@ from .config import settings
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-# Dummy user database (in production, use proper database)
+# Dummy user database (in production, use proper database).
+# Hashes are precomputed in config; nothing is hashed at import time.
 USERS_DB = {
-    "sales_user_01": {
-        "username": "sales_user_01",
-        "name": "Sales User",
-        "hashed_password": pwd_context.hash("password123"),
+    settings.demo_username: {
+        "username": settings.demo_username,
+        "name": settings.demo_user_name,
+        "hashed_password": settings.demo_password_hash,
         "active": True
     }
 }
 
+# Dedicated pool for bcrypt so login bursts don't take threads from the
+# default pool that serves the sync (scoring/DB) endpoints.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.auth_hash_workers, thread_name_prefix="auth-bcrypt"
+)
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+class TokenCache:
+    """
+    Thread-safe LRU of already verified tokens.
+    
+    Entries expire after ``ttl`` seconds or at the token's own ``exp``,
+    whichever comes first, so user changes are picked up within ``ttl``.
+    """
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at <= now:
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return user
+    
+    def put(self, token: str, user: Dict[str, Any], token_exp: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl
+        if token_exp is not None:
+            expires_at = min(expires_at, time.monotonic() + (token_exp - time.time()))
+        with self._lock:
+            self._entries[token] = (expires_at, user)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+token_cache = TokenCache(settings.token_cache_size, settings.token_cache_ttl_seconds)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash."""
@@ -48,13 +113,24 @@ def authenticate_user(username: str, password: str) -> Optional[Dict[str, Any]]:
         User dict if authentication successful, None otherwise
     """
     user = USERS_DB.get(username)
-    if not user:
+    if not user or not user.get("active", True):
         return None
     if not verify_password(password, user["hashed_password"]):
         return None
     return user
 
 
+async def authenticate_user_async(username: str, password: str) -> Optional[Dict[str, Any]]:
+    """
+    Run ``authenticate_user`` on the bcrypt worker pool.
+    
+    Keeps the event loop and the default threadpool free while the
+    password hash is being checked.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, authenticate_user, username, password)
+
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
     Create JWT access token.
@@ -81,15 +157,21 @@ def verify_token(token: str) -> Dict[str, Any]:
     """
     Verify and decode JWT token.
     
+    Successful verifications are cached in ``token_cache``.
+    
     Args:
         token: JWT token to verify
         
     Returns:
-        Decoded token payload
+        The authenticated user
         
     Raises:
         HTTPException: If token is invalid
     """
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -105,7 +187,21 @@ def verify_token(token: str) -> Dict[str, Any]:
         raise credentials_exception
     
     user = USERS_DB.get(username)
-    if user is None:
+    if user is None or not user.get("active", True):
         raise credentials_exception
     
-    return user
\ No newline at end of file
+    token_cache.put(token, user, payload.get("exp"))
+    return user
+
+
+def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> Dict[str, Any]:
+    """FastAPI dependency returning the user behind the ``Authorization: Bearer`` header."""
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return verify_token(credentials.credentials)
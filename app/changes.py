@@ -0,0 +1,152 @@
+"""
+Lead score change feed
+
+Every lead created or rescored through ``models.Lead`` appends a row to
+``lead_score_events`` in the same transaction. Consumers page through the
+log with ``/leads/changes?since=<cursor>`` (or follow it live over
+Server-Sent Events) instead of re-reading ``/leads``.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+_SCORE_ATTRS = ("score", "probability_score")
+
+# Arbitrary constant key for pg_advisory_xact_lock
+_EVENT_LOCK_KEY = 720451
+
+
+def _previous(lead: models.Lead, attr: str):
+    history = inspect(lead).attrs[attr].history
+    return history.deleted[0] if history.deleted else None
+
+
+def _record_events(session: Session, flush_context, instances) -> None:
+    """Append ``created`` / ``rescored`` events for leads in this flush."""
+    events = []
+    for obj in session.new:
+        if isinstance(obj, models.Lead):
+            events.append(models.LeadScoreEvent(
+                lead_id=obj.id,
+                event="created",
+                probability_score=obj.probability_score,
+                score=obj.score,
+            ))
+
+    for obj in session.dirty:
+        if not isinstance(obj, models.Lead):
+            continue
+        state = inspect(obj)
+        if not any(state.attrs[attr].history.has_changes() for attr in _SCORE_ATTRS):
+            continue
+        events.append(models.LeadScoreEvent(
+            lead_id=obj.id,
+            event="rescored",
+            probability_score=obj.probability_score,
+            score=obj.score,
+            previous_score=_previous(obj, "score"),
+        ))
+
+    if not events:
+        return
+
+    connection = session.connection()
+    if connection.dialect.name == "postgresql":
+        # Serialize event writers until commit so ids become visible in
+        # increasing order and a reader's cursor never skips a late commit.
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _EVENT_LOCK_KEY})
+    session.add_all(events)
+
+
+def register(session_factory=SessionLocal) -> None:
+    """Attach the event listener to a session factory (idempotent)."""
+    if not event.contains(session_factory, "before_flush", _record_events):
+        event.listen(session_factory, "before_flush", _record_events)
+
+
+def event_to_dict(row: models.LeadScoreEvent) -> Dict[str, Any]:
+    return {
+        "cursor": row.id,
+        "lead_id": row.lead_id,
+        "event": row.event,
+        "probability_score": row.probability_score,
+        "score": row.score,
+        "previous_score": row.previous_score,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+    }
+
+
+def get_changes(db: Session, since: int = 0, limit: int = 500) -> Dict[str, Any]:
+    """
+    Events with a cursor greater than ``since``, oldest first.
+
+    Returns:
+        ``events``, ``next_cursor`` (pass as ``since`` next time) and ``has_more``
+    """
+    rows: List[models.LeadScoreEvent] = (
+        db.query(models.LeadScoreEvent)
+        .filter(models.LeadScoreEvent.id > since)
+        .order_by(models.LeadScoreEvent.id)
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "events": [event_to_dict(row) for row in rows],
+        "next_cursor": rows[-1].id if rows else since,
+        "has_more": has_more,
+    }
+
+
+def _fetch_changes(since: int, limit: int) -> Dict[str, Any]:
+    db = SessionLocal()
+    try:
+        return get_changes(db, since, limit)
+    finally:
+        db.close()
+
+
+async def stream_changes(
+    since: int = 0,
+    poll_seconds: float = 1.0,
+    keepalive_seconds: float = 15.0,
+    limit: int = 500,
+) -> AsyncIterator[str]:
+    """
+    Server-Sent Events stream of new score events.
+
+    Each event carries its cursor as the SSE ``id`` so clients resume with
+    ``Last-Event-ID``. The database is polled off the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    idle = 0.0
+    while True:
+        page = await loop.run_in_executor(None, _fetch_changes, since, limit)
+        for item in page["events"]:
+            yield f"id: {item['cursor']}\nevent: {item['event']}\ndata: {json.dumps(item)}\n\n"
+        since = page["next_cursor"]
+
+        if page["events"]:
+            idle = 0.0
+            if page["has_more"]:
+                continue
+        elif idle >= keepalive_seconds:
+            yield ": keep-alive\n\n"
+            idle = 0.0
+
+        await asyncio.sleep(poll_seconds)
+        idle += poll_seconds
+
+
+register()
@@ -5,9 +5,17 @@ This module contains configuration classes and settings for different environmen
 """
 
 import os
+from pathlib import Path
 from typing import List, Optional
 from pydantic import BaseModel
 
+# Public placeholder; only accepted with DEBUG=true (see Settings.check_secret_key)
+DEFAULT_SECRET_KEY = "dummy-secret-key-change-in-production"
+
+
+class InsecureSecretKeyError(RuntimeError):
+    """Raised at startup when JWTs would be signed with the public default key."""
+
 
 class Settings(BaseModel):
     """Application settings with environment variable support."""
@@ -33,20 +41,79 @@ class Settings(BaseModel):
     cors_headers: List[str] = ["*"]
     
     # Model Configuration
-    model_dir: Optional[str] = None
+    model_dir: Optional[str] = os.getenv("MODEL_DIR")
     model_name: str = "model_final_xgb.pkl"
     scaler_name: str = "scaler.pkl"
     model_columns_name: str = "model_columns.pkl"
+    # "xgboost" (pickled model) or "trees" (NumPy evaluator over models/model_trees.npz)
+    model_engine: str = os.getenv("MODEL_ENGINE", "xgboost")
     
     # Authentication Configuration
-    secret_key: str = "dummy-secret-key-change-in-production"
+    secret_key: str = os.getenv("SECRET_KEY", DEFAULT_SECRET_KEY)
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     
+    # Demo user; the bcrypt hash is precomputed so nothing is hashed at import
+    # (default hash is for "password123"; an empty DEMO_PASSWORD_HASH counts as unset)
+    demo_username: str = os.getenv("DEMO_USERNAME", "sales_user_01")
+    demo_user_name: str = os.getenv("DEMO_USER_NAME", "Sales User")
+    demo_password_hash: str = (
+        os.getenv("DEMO_PASSWORD_HASH")
+        or "$2b$12$zNEo3MonFRJ2AJDFVXttpOHbef93MHS0H.qljSc5LlB/aNSAboJHG"
+    )
+    
+    # Verified-token cache and bcrypt worker pool
+    token_cache_size: int = int(os.getenv("TOKEN_CACHE_SIZE", "1024"))
+    token_cache_ttl_seconds: int = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "60"))
+    auth_hash_workers: int = int(os.getenv("AUTH_HASH_WORKERS", "2"))
+    
+    # Warm-up at startup: pre-open DB pool connections and run a dummy prediction
+    warmup: bool = os.getenv("WARMUP", "false").lower() == "true"
+    warmup_connections: int = int(os.getenv("WARMUP_CONNECTIONS", "5"))
+    
+    # Background jobs (/jobs/*): uploaded files and results live in job_dir
+    job_dir: str = os.getenv("JOB_DIR", str(Path(__file__).parent.parent / "jobs"))
+    job_chunk_rows: int = int(os.getenv("JOB_CHUNK_ROWS", "5000"))
+    job_poll_seconds: float = float(os.getenv("JOB_POLL_SECONDS", "1.0"))
+    # Worker processes started with the API; 0 = run `python -m app.jobs` separately
+    job_workers: int = int(os.getenv("JOB_WORKERS", "0"))
+    # Running job tanpa heartbeat selama ini dianggap worker-nya mati dan diambil ulang
+    job_lease_seconds: float = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+    
+    # Change feed SSE (/leads/changes/stream) polling interval
+    change_poll_seconds: float = float(os.getenv("CHANGE_POLL_SECONDS", "1.0"))
+    
+    # Shadow evaluation of a candidate model (/admin/shadow); off when unset
+    shadow_model_dir: Optional[str] = os.getenv("SHADOW_MODEL_DIR")
+    shadow_engine: str = os.getenv("SHADOW_ENGINE", "xgboost")
+    shadow_sample_rate: float = float(os.getenv("SHADOW_SAMPLE_RATE", "1.0"))
+    shadow_max_pending: int = int(os.getenv("SHADOW_MAX_PENDING", "8"))
+    shadow_buffer_size: int = int(os.getenv("SHADOW_BUFFER_SIZE", "10000"))
+    
+    # Input drift monitor (/metrics/drift); needs drift_reference.json in the model dir
+    drift_monitor: bool = os.getenv("DRIFT_MONITOR", "true").lower() == "true"
+    drift_batch_size: int = int(os.getenv("DRIFT_BATCH_SIZE", "256"))
+    
+    # Startup profiling: exposes timings at /debug/startup
+    startup_profile: bool = os.getenv("STARTUP_PROFILE", "false").lower() == "true"
+    
     # Logging Configuration
     log_level: str = "INFO"
     log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     
+    def check_secret_key(self) -> None:
+        """
+        Refuse to run with the default ``SECRET_KEY`` unless ``DEBUG`` is on.
+        
+        Raises:
+            InsecureSecretKeyError: If anyone could forge tokens
+        """
+        if self.secret_key == DEFAULT_SECRET_KEY and not self.debug:
+            raise InsecureSecretKeyError(
+                "SECRET_KEY is not set; refusing to sign tokens with the public default key. "
+                "Set SECRET_KEY (or DEBUG=true for local development)."
+            )
+    
 
 
 
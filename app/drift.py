@@ -0,0 +1,268 @@
+"""
+Input drift monitoring
+
+Keeps constant-memory streaming sketches of every model column seen by
+``ModelService`` and compares them with a reference profile built from
+the training CSV:
+
+- numeric columns: counts over the reference decile bins
+- one-hot columns: count of ones
+- columns the reference CSV has no data for (``no_reference``) are listed
+  but excluded from ``max_psi`` / ``max_ks``
+
+PSI and (binned) KS statistics are served at ``/metrics/drift``.
+
+Observing rows only appends them to a deque (no lock); pending
+observations are folded into the sketches in vectorized batches of
+``batch_size``.
+
+Build the reference profile with::
+
+    python -m app.drift [csv_path]
+"""
+
+import json
+import logging
+import threading
+from collections import deque
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_FILE_NAME = "drift_reference.json"
+
+# Floor for empty bins so PSI stays finite
+_EPSILON = 1e-4
+
+
+def model_space(df_raw: "pd.DataFrame", model_columns: Sequence[str]) -> Tuple["pd.DataFrame", Set[str]]:
+    """
+    Raw CSV rows in model-column space (one-hot encoded, unscaled), encoded
+    with ``inference.encode_raw`` like every prediction.
+
+    Returns:
+        The frame, and the model columns the rows actually carry data for
+        (a source column or category level that is absent is only zero-filled)
+    """
+    import pandas as pd
+
+    from .inference import CATEGORICAL_FIELDS, encode_raw
+
+    rows, _, _ = encode_raw(df_raw, model_columns)
+    present = set()
+    for i, col in enumerate(model_columns):
+        if any(col.startswith(f"{field}_") for field in CATEGORICAL_FIELDS):
+            if rows[:, i].any():
+                present.add(col)
+        elif not np.isnan(rows[:, i]).all():
+            present.add(col)
+    return pd.DataFrame(np.nan_to_num(rows, nan=0.0), columns=list(model_columns)), present
+
+
+def build_reference(csv_path: Union[str, Path], model_columns: Sequence[str], bins: int = 10) -> Dict[str, Any]:
+    """
+    Profile the training CSV in model-column space.
+
+    Columns the CSV has no data for are marked ``no_reference`` and are
+    not monitored.
+
+    Returns:
+        Reference profile, JSON serialisable
+    """
+    import pandas as pd
+
+    from .inference import CATEGORICAL_FIELDS
+
+    df, present = model_space(pd.read_csv(csv_path, sep=";"), model_columns)
+
+    columns: Dict[str, Any] = {}
+    for col in model_columns:
+        if col not in present:
+            columns[col] = {"type": "no_reference"}
+            continue
+        values = df[col].to_numpy()
+        if any(col.startswith(f"{field}_") for field in CATEGORICAL_FIELDS):
+            columns[col] = {"type": "onehot", "rate": float(values.mean())}
+            continue
+        # Deciles, plus edges at the reference min / just above the max so
+        # out-of-range values land in their own (empty in reference) bins
+        quantiles = np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1])
+        edges = np.unique(np.concatenate([
+            [values.min()], quantiles, [np.nextafter(values.max(), np.inf)],
+        ]))
+        counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+        columns[col] = {
+            "type": "numeric",
+            "edges": edges.tolist(),
+            "proportions": (counts / counts.sum()).tolist(),
+        }
+
+    return {"source": str(csv_path), "rows": int(len(df)), "columns": columns}
+
+
+def psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Population stability index between two proportion vectors."""
+    expected = np.clip(expected, _EPSILON, None)
+    actual = np.clip(actual, _EPSILON, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def binned_ks(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Kolmogorov-Smirnov statistic evaluated at the bin edges."""
+    return float(np.max(np.abs(np.cumsum(expected) - np.cumsum(actual))))
+
+
+class DriftMonitor:
+    """Streaming per-column sketches compared against a reference profile."""
+
+    def __init__(self, reference: Dict[str, Any], model_columns: Sequence[str], batch_size: int = 256):
+        self.reference = reference
+        self.model_columns = list(model_columns)
+        self.batch_size = batch_size
+
+        ref_columns = reference["columns"]
+        index = {col: i for i, col in enumerate(self.model_columns)}
+
+        self.numeric = [c for c in self.model_columns if ref_columns.get(c, {}).get("type") == "numeric"]
+        self.onehot = [c for c in self.model_columns if ref_columns.get(c, {}).get("type") == "onehot"]
+        self.unreferenced = [c for c in self.model_columns if ref_columns.get(c, {}).get("type") == "no_reference"]
+        self._numeric_index = np.array([index[c] for c in self.numeric], dtype=np.intp)
+        self._onehot_index = np.array([index[c] for c in self.onehot], dtype=np.intp)
+        self._edges = [np.asarray(ref_columns[c]["edges"], dtype=np.float64) for c in self.numeric]
+        self._ref_proportions = [np.asarray(ref_columns[c]["proportions"]) for c in self.numeric]
+        self._ref_rates = np.array([ref_columns[c]["rate"] for c in self.onehot], dtype=np.float64)
+
+        # Sketch state: fixed size regardless of traffic
+        self._bin_counts = [np.zeros(len(e) + 1, dtype=np.int64) for e in self._edges]
+        self._ones = np.zeros(len(self.onehot), dtype=np.int64)
+        self.count = 0
+
+        self._pending: deque = deque()
+        self._flush_lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Union[str, Path], model_columns: Sequence[str], batch_size: int = 256) -> "DriftMonitor":
+        with open(path) as f:
+            return cls(json.load(f), model_columns, batch_size)
+
+    def observe(self, rows: np.ndarray) -> None:
+        """
+        Record feature rows (model column order, unscaled).
+
+        Cheap on the request path: an append, plus a vectorized fold into the
+        sketches once ``batch_size`` observations are pending.
+        """
+        self._pending.append(rows)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Fold pending rows into the sketches."""
+        if not self._flush_lock.acquire(blocking=False):
+            return  # another thread is already flushing
+        try:
+            batch = []
+            while self._pending:
+                batch.append(self._pending.popleft())
+            if not batch:
+                return
+            X = np.vstack(batch).astype(np.float64, copy=False)
+
+            for i, col in enumerate(self._numeric_index):
+                values = X[:, col]
+                values = values[~np.isnan(values)]
+                self._bin_counts[i] += np.bincount(
+                    np.searchsorted(self._edges[i], values, side="right"),
+                    minlength=len(self._edges[i]) + 1,
+                )
+            if len(self._onehot_index):
+                self._ones += (X[:, self._onehot_index] >= 0.5).sum(axis=0)
+            self.count += X.shape[0]
+        finally:
+            self._flush_lock.release()
+
+    def report(self) -> Dict[str, Any]:
+        """PSI / KS per column against the reference profile."""
+        self.flush()
+        columns: Dict[str, Any] = {}
+
+        if self.count:
+            for i, col in enumerate(self.numeric):
+                observed = int(self._bin_counts[i].sum())
+                if not observed:
+                    # Only ever omitted (NaN) so far: nothing to compare yet
+                    columns[col] = {"type": "numeric", "observed": 0}
+                    continue
+                actual = self._bin_counts[i] / observed
+                expected = self._ref_proportions[i]
+                columns[col] = {
+                    "type": "numeric",
+                    "observed": observed,
+                    "psi": psi(expected, actual),
+                    "ks": binned_ks(expected, actual),
+                }
+            rates = self._ones / self.count
+            for i, col in enumerate(self.onehot):
+                expected = np.array([1 - self._ref_rates[i], self._ref_rates[i]])
+                actual = np.array([1 - rates[i], rates[i]])
+                columns[col] = {
+                    "type": "onehot",
+                    "rate": float(rates[i]),
+                    "reference_rate": float(self._ref_rates[i]),
+                    "psi": psi(expected, actual),
+                    "ks": float(abs(rates[i] - self._ref_rates[i])),
+                }
+        # Reported but never alarmed on: the reference has no data for them
+        for col in self.unreferenced:
+            columns[col] = {"type": "no_reference"}
+
+        scored = [c for c in columns.values() if "psi" in c]
+        return {
+            "observed_rows": self.count,
+            "reference_rows": self.reference.get("rows"),
+            "max_psi": max((c["psi"] for c in scored), default=None),
+            "max_ks": max((c["ks"] for c in scored), default=None),
+            "columns": columns,
+        }
+
+
+def to_prometheus(report: Dict[str, Any]) -> str:
+    """Render a drift report in the Prometheus text exposition format."""
+    lines = [
+        "# TYPE lead_scoring_drift_observed_rows counter",
+        f"lead_scoring_drift_observed_rows {report['observed_rows']}",
+        "# TYPE lead_scoring_drift_psi gauge",
+    ]
+    scored = {col: stats for col, stats in report["columns"].items() if "psi" in stats}
+    for col, stats in scored.items():
+        lines.append(f'lead_scoring_drift_psi{{feature="{col}"}} {stats["psi"]:.6f}')
+    lines.append("# TYPE lead_scoring_drift_ks gauge")
+    for col, stats in scored.items():
+        lines.append(f'lead_scoring_drift_ks{{feature="{col}"}} {stats["ks"]:.6f}')
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    import argparse
+    import joblib
+
+    project_root = Path(__file__).parent.parent
+    parser = argparse.ArgumentParser(description="Build the drift reference profile")
+    parser.add_argument("csv_path", nargs="?", default=str(project_root / "ml" / "dataset" / "bank.csv"))
+    parser.add_argument("--model-dir", default=str(project_root / "models"))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    columns = joblib.load(Path(args.model_dir) / "model_columns.pkl")
+    profile = build_reference(args.csv_path, columns)
+    profile["source"] = Path(args.csv_path).name
+    out = Path(args.model_dir) / REFERENCE_FILE_NAME
+    with open(out, "w") as f:
+        json.dump(profile, f, indent=1)
+    logger.info(f"Wrote drift reference for {len(columns)} columns to {out}")
@@ -7,15 +7,127 @@ ML models for lead scoring predictions.
 
 import os
 import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, List, Union, Optional
+from typing import TYPE_CHECKING, Dict, Any, List, Mapping, Sequence, Tuple, Union, Optional
 
-import pandas as pd
-import xgboost
+# pandas (and xgboost, pulled in when the pickled model is unpickled) are
+# imported lazily so that importing the API does not pay for them.
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Raw categorical fields, one-hot encoded as ``{field}_{value}``
+CATEGORICAL_FIELDS = (
+    "job", "marital", "education", "default", "housing", "loan",
+    "contact", "month", "day_of_week", "poutcome",
+)
+
+# Levels dropped by ``get_dummies(drop_first=True)`` in training: all-zero rows
+BASELINE_LEVELS = {
+    "job": "admin.", "marital": "divorced", "education": "basic.4y",
+    "default": "no", "housing": "no", "loan": "no", "contact": "cellular",
+    "month": "apr", "day_of_week": "fri", "poutcome": "failure",
+}
+
+# Raw numeric field name -> model column name
+NUMERIC_ALIASES = {
+    "emp_var_rate": "emp.var.rate",
+    "cons_price_idx": "cons.price.idx",
+    "cons_conf_idx": "cons.conf.idx",
+    "nr_employed": "nr.employed",
+}
+
+# pdays values meaning "never contacted" (bank.csv / bank-additional)
+NOT_CONTACTED_PDAYS = (-1, 999)
+
+
+@lru_cache(maxsize=8)
+def _column_layout(model_columns: Tuple[str, ...]) -> Tuple[Dict[str, int], Dict[str, List[Tuple[str, int]]], List[int]]:
+    """Column index, ``field -> [(level, index)]`` for one-hot columns, and value column indices."""
+    index = {col: i for i, col in enumerate(model_columns)}
+    levels: Dict[str, List[Tuple[str, int]]] = {}
+    value_index = []
+    for i, col in enumerate(model_columns):
+        field = next((f for f in CATEGORICAL_FIELDS if col.startswith(f"{f}_")), None)
+        if field is None:
+            value_index.append(i)
+        else:
+            levels.setdefault(field, []).append((col[len(field) + 1:], i))
+    return index, levels, value_index
+
+
+def encode_raw(
+    raw: Mapping[str, Sequence[Any]], model_columns: Sequence[str]
+) -> Tuple["np.ndarray", List[str], List[str]]:
+    """
+    Encode raw lead rows (``bank.csv`` / bank-additional columns) into model columns.
+    
+    The one raw -> model encoding, shared by the ``/predict`` lead form,
+    batch scoring and the drift reference: one-hot ``CATEGORICAL_FIELDS``
+    (baseline levels are all-zero), ``NUMERIC_ALIASES`` and
+    ``pdays`` -> ``pernah_dihubungi``.
+    
+    Args:
+        raw: Column name -> values, e.g. a DataFrame; ``None`` means not provided
+        model_columns: Model column order
+        
+    Returns:
+        ``(rows, unknown, missing)``: unscaled float64 rows with NaN in value
+        columns no input provided, input fields and category levels the model
+        has no column for, and categorical fields the model uses that were
+        not provided
+    """
+    import numpy as np
+    
+    index, levels, value_index = _column_layout(tuple(model_columns))
+    n_rows = len(raw[next(iter(raw))]) if len(raw) else 0
+    rows = np.zeros((n_rows, len(index)), dtype=np.float64)
+    rows[:, value_index] = np.nan
+    unknown: List[str] = []
+    provided = set()
+    
+    for name in raw:
+        if name == "y":
+            continue
+        if name in CATEGORICAL_FIELDS:
+            values = np.asarray(raw[name], dtype=object)
+            given = {v for v in values if v is not None and v == v}
+            if not given:
+                continue
+            provided.add(name)
+            known = {BASELINE_LEVELS.get(name)}
+            for level, i in levels.get(name, ()):
+                rows[:, i] = values == level
+                known.add(level)
+            unknown.extend(f"{name}={v}" for v in sorted(given - known, key=str))
+            continue
+        
+        try:
+            values = np.asarray(raw[name], dtype=np.float64)
+        except (TypeError, ValueError):
+            if NUMERIC_ALIASES.get(name, name) in index or name == "pdays":
+                raise ValueError(f"Field '{name}' must be numeric")
+            unknown.append(name)
+            continue
+        if np.isnan(values).all():
+            continue
+        if name == "pdays":
+            name, values = "pernah_dihubungi", np.where(
+                np.isnan(values), np.nan, ~np.isin(values, NOT_CONTACTED_PDAYS)
+            )
+        i = index.get(NUMERIC_ALIASES.get(name, name))
+        if i is None:
+            unknown.append(name)
+        else:
+            rows[:, i] = values
+    
+    missing = [field for field in levels if field not in provided]
+    return rows, unknown, missing
+
 
 class ModelService:
     """
@@ -23,23 +135,37 @@ class ModelService:
     
     This service handles model loading, preprocessing, and inference.
     It supports both trained models (via joblib) and fallback dummy predictions.
+    
+    Two engines are available: ``"xgboost"`` (the pickled XGBClassifier) and
+    ``"trees"`` (the NumPy evaluator in ``app.trees``, which needs neither
+    xgboost, pandas nor scikit-learn at runtime).
     """
     
-    def __init__(self, model_dir: Optional[str] = None):
+    ENGINES = ("xgboost", "trees")
+    
+    def __init__(self, model_dir: Optional[str] = None, engine: str = "xgboost"):
         """
         Initialize the ModelService.
         
         Args:
             model_dir: Optional path to model directory. If None, uses default location.
+            engine: ``"xgboost"`` or ``"trees"``
         """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown model engine: {engine}")
+        
+        self.engine: str = engine
         self.model_version: str = "v0.0-dummy"
         self.expected_features: List[str] = []
         self.model: Optional[Any] = None
         self.scaler: Optional[Any] = None
         self.model_columns: Optional[List[str]] = None
+        # Optional app.drift.DriftMonitor fed with every preprocessed row
+        self.drift_monitor: Optional[Any] = None
         
         self._model_dir = model_dir or self._get_default_model_dir()
         self._load_artifacts()
+        self._index_columns()
     
     def _get_default_model_dir(self) -> str:
         """Get the default model directory path."""
@@ -52,6 +178,10 @@ class ModelService:
         Attempts to load model, scaler, and feature columns.
         Falls back to dummy mode if artifacts are not available.
         """
+        if self.engine == "trees":
+            self._load_tree_artifacts()
+            return
+        
         try:
             import joblib
             
@@ -88,7 +218,65 @@ class ModelService:
             self.scaler = None
             self.model_columns = None
     
-    def preprocess(self, features: Dict[str, Any]) -> Union[Dict[str, Any], pd.DataFrame]:
+    def _load_tree_artifacts(self) -> None:
+        """Load the exported tree arrays (see ``python -m app.trees``)."""
+        from .trees import TREES_FILE_NAME, TreeEnsemble
+        
+        trees_path = Path(self._model_dir) / TREES_FILE_NAME
+        if not trees_path.exists():
+            logger.warning(f"Tree export not found: {trees_path}")
+            return
+        
+        try:
+            self.model = TreeEnsemble.load(trees_path)
+            self.model_version = "v1.0"
+            self.model_columns = list(self.model.columns)
+            self.expected_features = self.model_columns.copy()
+            logger.info(f"Loaded {self.model.n_trees} trees from {trees_path}")
+        except Exception as e:
+            logger.error(f"Error loading tree export: {e}")
+            self.model = None
+            self.model_columns = None
+    
+    def _index_columns(self) -> None:
+        """Precompute column lookups used by the strict ``score`` path."""
+        self._column_index: Dict[str, int] = {
+            col: i for i, col in enumerate(self.model_columns or [])
+        }
+        # Columns that must be supplied; absent one-hot columns simply mean 0
+        self._value_columns: List[str] = [
+            col for col in self.model_columns or []
+            if not any(col.startswith(f"{field}_") for field in CATEGORICAL_FIELDS)
+        ]
+        
+        # StandardScaler as index/mean/scale arrays, so scoring one row needs no pandas
+        self._scaler_arrays = None
+        scaler_cols = getattr(self.scaler, "feature_names_in_", None)
+        if self.engine == "xgboost" and scaler_cols is not None and hasattr(self.scaler, "mean_"):
+            import numpy as np
+            
+            if all(col in self._column_index for col in scaler_cols):
+                self._scaler_arrays = (
+                    np.array([self._column_index[col] for col in scaler_cols], dtype=np.intp),
+                    np.asarray(self.scaler.mean_, dtype=np.float64),
+                    np.asarray(self.scaler.scale_, dtype=np.float64),
+                )
+    
+    def _preprocess_array(self, features: Dict[str, Any]) -> "np.ndarray":
+        """Build a single scaled feature row for the tree engine, without pandas."""
+        import numpy as np
+        
+        row = np.zeros((1, len(self.model_columns)), dtype=np.float64)
+        for i, col in enumerate(self.model_columns):
+            value = features.get(col)
+            if value is not None:
+                row[0, i] = float(value)
+        observed = row.copy()
+        observed[0, [self._column_index[col] for col in self._value_columns if features.get(col) is None]] = np.nan
+        self._observe(observed)
+        return self.model.scale(row)
+    
+    def preprocess(self, features: Dict[str, Any]) -> Union[Dict[str, Any], "pd.DataFrame"]:
         """
         Preprocess input features for model prediction.
         
@@ -101,6 +289,11 @@ class ModelService:
         if self.model_columns is None:
             return features or {}
         
+        if self.engine == "trees":
+            return self._preprocess_array(features)
+        
+        import pandas as pd
+        
         try:
             # Create DataFrame with input features
             df = pd.DataFrame([features])
@@ -112,25 +305,75 @@ class ModelService:
             
             # Reorder columns to match model expectations
             df = df[self.model_columns]
+            # Omitted value columns are observed as NaN, not as real zeros
+            self._observe(df.assign(**{
+                col: float("nan") for col in self._value_columns if features.get(col) is None
+            }))
             
-            # Apply scaling if scaler is available
-            if self.scaler is not None:
-                try:
-                    numeric_cols = [
-                        c for c in df.columns 
-                        if df[c].dtype in ["float64", "int64", "float32", "int32"]
-                    ]
-                    if numeric_cols:
-                        df[numeric_cols] = self.scaler.transform(df[numeric_cols])
-                except Exception as e:
-                    logger.warning(f"Error applying scaler: {e}")
-            
-            return df
+            return self._apply_scaler(df)
             
         except Exception as e:
             logger.error(f"Error in preprocessing: {e}")
             return features or {}
     
+    def _observe(self, rows: Union["np.ndarray", "pd.DataFrame"]) -> None:
+        """Hand unscaled model-column rows to the drift monitor, if any."""
+        if self.drift_monitor is None:
+            return
+        
+        import numpy as np
+        
+        try:
+            # Copy: the caller scales its rows in place afterwards
+            self.drift_monitor.observe(np.array(rows, dtype=np.float64))
+        except (TypeError, ValueError):
+            # Non-numeric values; the prediction path reports those
+            pass
+    
+    def _apply_scaler(self, df: "pd.DataFrame") -> "pd.DataFrame":
+        """Apply the fitted scaler (if any) to its numeric columns of ``df``."""
+        if self.scaler is None:
+            return df
+        
+        try:
+            scaler_cols = getattr(self.scaler, "feature_names_in_", None)
+            if scaler_cols is not None:
+                # Only the columns the scaler was fitted on
+                numeric_cols = [c for c in scaler_cols if c in df.columns]
+            else:
+                numeric_cols = [
+                    c for c in df.columns 
+                    if df[c].dtype in ["float64", "int64", "float32", "int32"]
+                ]
+            if numeric_cols:
+                df[numeric_cols] = self.scaler.transform(df[numeric_cols])
+        except Exception as e:
+            logger.warning(f"Error applying scaler: {e}")
+        
+        return df
+    
+    def predict_batch(self, frame: "pd.DataFrame") -> List[float]:
+        """
+        Score many raw rows (``bank.csv`` columns) with a single model call.
+        
+        Rows are encoded with ``encode_raw``, exactly like the ``/predict``
+        lead form.
+        
+        Args:
+            frame: Raw rows
+            
+        Returns:
+            Positive-class probability per row
+        """
+        if len(frame) == 0:
+            return []
+        
+        if self.model is None or self.model_columns is None:
+            return [self._dummy_predict(row) for row in frame.to_dict("records")]
+        
+        rows, _, _ = encode_raw(frame, self.model_columns)
+        return self._predict_rows(rows)
+    
     def predict(self, features: Dict[str, Any]) -> float:
         """
         Generate lead score prediction.
@@ -155,7 +398,7 @@ class ModelService:
                 return self._dummy_predict(preprocessed)
             else:
                 # Use trained model
-                if isinstance(preprocessed, pd.DataFrame):
+                if not isinstance(preprocessed, dict):
                     probabilities = self.model.predict_proba(preprocessed)
                     return float(probabilities[0, 1])  # Return positive class probability
                 else:
@@ -166,7 +409,122 @@ class ModelService:
             # Return neutral probability on error
             return 0.5
     
-    def _dummy_predict(self, features: Union[Dict[str, Any], pd.DataFrame]) -> float:
+    def encode_lead(self, lead: Dict[str, Any]) -> Tuple[Dict[str, float], List[str], List[str]]:
+        """
+        Encode one typed raw lead (``schemas.LeadFeatures``) with ``encode_raw``.
+        
+        Args:
+            lead: Raw field values; ``None`` means not provided
+            
+        Returns:
+            ``(features, unknown, missing)``: encoded model columns (value
+            columns the lead does not provide are left out), unknown input
+            fields and category levels, and omitted categorical fields the
+            model uses
+        """
+        if self.model_columns is None:
+            # Dummy mode: no model columns to encode into
+            return {name: value for name, value in lead.items() if value is not None}, [], []
+        
+        rows, unknown, missing = encode_raw({name: [value] for name, value in lead.items()}, self.model_columns)
+        features = {col: float(x) for col, x in zip(self.model_columns, rows[0]) if x == x}
+        return features, unknown, missing
+    
+    def score(
+        self,
+        features: Optional[Dict[str, Any]] = None,
+        values: Optional[Sequence[float]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Strict single-row prediction: bad input raises instead of scoring 0.5.
+        
+        Args:
+            features: Encoded model columns by name
+            values: One value per model column, in ``expected_features`` order
+            
+        Returns:
+            ``probability``, plus ``unknown_features`` (names the model does not
+            use) and ``missing_features`` (model columns that were filled with 0)
+            
+        Raises:
+            ValueError: If the input cannot be scored
+        """
+        import numpy as np
+        
+        if values is not None:
+            if self.model is None or self.model_columns is None:
+                raise ValueError("Array input needs a loaded model (see /metadata)")
+            if len(values) != len(self.model_columns):
+                raise ValueError(
+                    f"Expected {len(self.model_columns)} values in /metadata order, got {len(values)}"
+                )
+            row = np.array(values, dtype=np.float64).reshape(1, -1)
+            return {
+                "probability": self._predict_row(row),
+                "unknown_features": [],
+                "missing_features": [],
+            }
+        
+        if not features:
+            raise ValueError("Features dictionary cannot be empty")
+        
+        if self.model is None or self.model_columns is None:
+            return {
+                "probability": self._dummy_predict(features),
+                "unknown_features": [],
+                "missing_features": [],
+            }
+        
+        index = self._column_index
+        row = np.zeros((1, len(index)), dtype=np.float64)
+        unknown = []
+        for name, value in features.items():
+            i = index.get(name)
+            if i is None:
+                unknown.append(name)
+            elif value is not None:
+                try:
+                    row[0, i] = float(value)
+                except (TypeError, ValueError):
+                    raise ValueError(f"Feature '{name}' must be numeric, got {value!r}")
+        missing = [col for col in self._value_columns if features.get(col) is None]
+        row[0, [index[col] for col in missing]] = np.nan
+        
+        return {
+            "probability": self._predict_row(row),
+            "unknown_features": unknown,
+            "missing_features": missing,
+        }
+    
+    def _predict_row(self, row: "np.ndarray", observe: bool = True) -> float:
+        """Observe (unless ``observe`` is False), scale and score one unscaled model-column row."""
+        return self._predict_rows(row, observe)[0]
+    
+    def _predict_rows(self, rows: "np.ndarray", observe: bool = True) -> List[float]:
+        """
+        Observe (unless ``observe`` is False), scale and score unscaled model-column rows.
+        
+        NaN marks a value that was not provided: the drift monitor skips it,
+        the model scores it as 0.
+        """
+        import numpy as np
+        
+        if observe:
+            self._observe(rows)
+        rows = np.nan_to_num(rows, nan=0.0)
+        if self.engine == "trees":
+            X = self.model.scale(rows)
+        elif self._scaler_arrays is not None:
+            index, mean, scale = self._scaler_arrays
+            rows[:, index] = (rows[:, index] - mean) / scale
+            X = rows
+        else:
+            import pandas as pd
+            
+            X = self._apply_scaler(pd.DataFrame(rows, columns=self.model_columns))
+        return [float(p) for p in self.model.predict_proba(X)[:, 1]]
+    
+    def _dummy_predict(self, features: Union[Dict[str, Any], "pd.DataFrame"]) -> float:
         """
         Generate dummy prediction when model is not available.
         
@@ -198,6 +556,22 @@ class ModelService:
             logger.warning(f"Error in dummy prediction: {e}")
             return 0.5
     
+    def warmup(self) -> None:
+        """
+        Run one dummy prediction so the first real request does not pay
+        for lazy imports and the model's thread-pool setup.
+        """
+        if self.model is None or self.model_columns is None:
+            return
+        
+        import numpy as np
+        
+        try:
+            # Not observed: a synthetic all-zero row must not reach the drift sketches
+            self._predict_row(np.zeros((1, len(self.model_columns))), observe=False)
+        except Exception as e:
+            logger.warning(f"Model warm-up failed: {e}")
+    
     def is_model_loaded(self) -> bool:
         """Check if a trained model is loaded."""
         return self.model is not None
@@ -206,6 +580,7 @@ class ModelService:
         """Get information about the loaded model."""
         return {
             "version": self.model_version,
+            "engine": self.engine,
             "model_loaded": self.is_model_loaded(),
             "scaler_loaded": self.scaler is not None,
             "feature_count": len(self.expected_features),
@@ -0,0 +1,377 @@
+"""
+Background job queue
+
+Large scoring and import files are uploaded to ``/jobs/*``, stored in
+``settings.job_dir`` and queued as rows of the ``jobs`` table. A local
+pool of worker processes claims queued jobs with an atomic UPDATE (works
+on both Postgres and SQLite, no external broker) and processes the file
+in chunks, recording progress after each chunk.
+
+Each chunk commit also refreshes the job's ``heartbeat_at`` lease. A
+``running`` job whose lease is older than ``JOB_LEASE_SECONDS`` (worker
+crashed or was terminated on shutdown) is claimed again by the next free
+worker: score jobs restart, import jobs resume after the last committed
+chunk.
+
+Run the workers with::
+
+    python -m app.jobs --workers 2
+
+or set ``JOB_WORKERS`` to start them together with the API.
+"""
+
+import logging
+import multiprocessing
+import os
+import shutil
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import settings
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("score", "import")
+
+# Keep the first few error messages only; the count is always exact
+MAX_STORED_ERRORS = 20
+
+_model_service = None
+
+
+class LeaseLostError(RuntimeError):
+    """The job was reclaimed by another worker while this one was running it."""
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite returns naive datetimes even for timezone=True columns
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _get_model_service():
+    global _model_service
+    if _model_service is None:
+        from .inference import ModelService
+        _model_service = ModelService(settings.model_dir, engine=settings.model_engine)
+    return _model_service
+
+
+def enqueue_job(db: Session, kind: str, fileobj: BinaryIO, filename: Optional[str] = None) -> models.Job:
+    """
+    Store an uploaded file and queue it for the workers.
+
+    Args:
+        db: Database session
+        kind: ``"score"`` or ``"import"``
+        fileobj: Readable binary file; streamed to disk, never held in memory
+        filename: Original file name, for display only
+
+    Returns:
+        The queued job
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown job kind: {kind}")
+
+    job_dir = Path(settings.job_dir)
+    job_dir.mkdir(parents=True, exist_ok=True)
+    input_path = job_dir / f"{uuid.uuid4().hex}.csv"
+    with open(input_path, "wb") as out:
+        shutil.copyfileobj(fileobj, out, length=1024 * 1024)
+
+    job = models.Job(
+        kind=kind,
+        status="queued",
+        filename=filename,
+        input_path=str(input_path),
+        processed_rows=0,
+        error_count=0,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def _claimable(now: datetime):
+    lease_expired = now - timedelta(seconds=settings.job_lease_seconds)
+    return or_(
+        models.Job.status == "queued",
+        and_(
+            models.Job.status == "running",
+            or_(models.Job.heartbeat_at.is_(None), models.Job.heartbeat_at < lease_expired),
+        ),
+    )
+
+
+def claim_next_job(db: Session, worker: str) -> Optional[models.Job]:
+    """
+    Atomically move the oldest queued job, or a running job whose lease
+    expired, to ``running`` for ``worker``.
+
+    The conditional UPDATE only succeeds for one worker even if several
+    select the same id, so no row locks or broker are needed.
+    """
+    while True:
+        now = _utcnow()
+        job_id = db.execute(
+            select(models.Job.id)
+            .where(_claimable(now))
+            .order_by(models.Job.id)
+            .limit(1)
+        ).scalar()
+        if job_id is None:
+            db.rollback()
+            return None
+
+        claimed = db.execute(
+            update(models.Job)
+            .where(models.Job.id == job_id, _claimable(now))
+            .values(status="running", worker=worker, started_at=now, heartbeat_at=now)
+        ).rowcount
+        db.commit()
+        if claimed:
+            return db.get(models.Job, job_id)
+
+
+def _heartbeat(db: Session, job: models.Job) -> None:
+    """Renew the lease in the current transaction; fails if another worker took the job."""
+    renewed = db.execute(
+        update(models.Job)
+        .where(models.Job.id == job.id, models.Job.worker == job.worker)
+        .values(heartbeat_at=_utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not renewed:
+        raise LeaseLostError(f"Job {job.id} was reclaimed by another worker")
+
+
+def _count_rows(path: str) -> int:
+    with open(path, "rb") as f:
+        lines = sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1024 * 1024), b""))
+    # header line; a missing trailing newline is fine to under-count by one
+    return max(lines - 1, 0)
+
+
+def _read_chunks(path: str):
+    import pandas as pd
+
+    # bank.csv uses ';' but accept comma-separated uploads too
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        header = f.readline()
+    sep = ";" if header.count(";") > header.count(",") else ","
+    return pd.read_csv(path, sep=sep, chunksize=settings.job_chunk_rows)
+
+
+def _process_score_chunk(job: models.Job, chunk, db: Session) -> List[str]:
+    from .importer import score_rows
+
+    probabilities = score_rows(chunk, _get_model_service())
+    out = chunk.copy()
+    out["probability"] = probabilities
+    out["score"] = [int(round(p * 100)) for p in probabilities]
+    first = not os.path.exists(job.result_path)
+    out.to_csv(job.result_path, mode="a", header=first, index=False)
+    return []
+
+
+def _process_import_chunk(job: models.Job, chunk, db: Session) -> List[str]:
+    from .importer import build_leads
+
+    leads, errors = build_leads(chunk, _get_model_service(), id_prefix=f"JOB{job.id}")
+    db.add_all(leads)
+    # Surface constraint errors here so they only fail this chunk
+    db.flush()
+    return errors
+
+
+_PROCESSORS = {
+    "score": _process_score_chunk,
+    "import": _process_import_chunk,
+}
+
+
+def run_job(db: Session, job: models.Job) -> models.Job:
+    """Process a claimed job chunk by chunk, committing progress after each chunk."""
+    process_chunk = _PROCESSORS[job.kind]
+    if job.kind == "score" or not job.processed_rows:
+        # Fresh start (or a reclaimed score job: its result file is rewritten)
+        job.processed_rows = 0
+        job.error_count = 0
+        job.errors = []
+    # Reclaimed import job: chunks up to processed_rows are already committed
+    resume_from = job.processed_rows
+    errors: List[str] = list(job.errors or [])
+
+    try:
+        job.total_rows = _count_rows(job.input_path)
+        if job.kind == "score":
+            job.result_path = str(Path(job.input_path).with_suffix(".result.csv"))
+            if os.path.exists(job.result_path):
+                os.remove(job.result_path)
+        _heartbeat(db, job)
+        db.commit()
+
+        for chunk in _read_chunks(job.input_path):
+            chunk = chunk[chunk.index >= resume_from]
+            if chunk.empty:
+                continue
+            try:
+                chunk_errors = process_chunk(job, chunk, db)
+                failed_rows = len(chunk_errors)
+            except Exception as e:
+                # The whole chunk is lost; count every row but store one message
+                db.rollback()
+                chunk_errors = [f"rows {chunk.index[0]}-{chunk.index[-1]}: {e}"]
+                failed_rows = len(chunk)
+            job.processed_rows += len(chunk)
+            job.error_count += failed_rows
+            errors.extend(chunk_errors[:max(0, MAX_STORED_ERRORS - len(errors))])
+            job.errors = list(errors)
+            _heartbeat(db, job)
+            db.commit()
+
+        job.status = "done"
+    except LeaseLostError:
+        # The new owner finishes the job; leave its row alone
+        db.rollback()
+        logger.warning(f"Job {job.id} lease lost, stopping")
+        return job
+    except Exception as e:
+        db.rollback()
+        logger.exception(f"Job {job.id} failed")
+        job.status = "failed"
+        job.error_count += 1
+        job.errors = (errors + [str(e)])[-MAX_STORED_ERRORS:]
+
+    if job.total_rows is not None and job.processed_rows > job.total_rows:
+        job.total_rows = job.processed_rows
+    job.finished_at = _utcnow()
+    db.commit()
+    return job
+
+
+def process_next_job(worker: Optional[str] = None) -> Optional[int]:
+    """Claim and run one job; returns its id, or None if the queue is empty."""
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    db = SessionLocal()
+    try:
+        job = claim_next_job(db, worker)
+        if job is None:
+            return None
+        logger.info(f"Worker {worker} running job {job.id} ({job.kind})")
+        run_job(db, job)
+        return job.id
+    finally:
+        db.close()
+
+
+def job_progress(job: models.Job) -> Dict[str, Any]:
+    """Status payload for ``GET /jobs/{id}``."""
+    started_at = _aware(job.started_at)
+    finished_at = _aware(job.finished_at)
+
+    rows_per_sec = None
+    if started_at is not None:
+        elapsed = ((finished_at or _utcnow()) - started_at).total_seconds()
+        if elapsed > 0:
+            rows_per_sec = round(job.processed_rows / elapsed, 2)
+
+    percent = None
+    if job.status == "done":
+        percent = 100.0
+    elif job.total_rows:
+        percent = round(min(100.0, 100.0 * job.processed_rows / job.total_rows), 2)
+
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "filename": job.filename,
+        "total_rows": job.total_rows,
+        "processed_rows": job.processed_rows,
+        "percent_complete": percent,
+        "rows_per_sec": rows_per_sec,
+        "error_count": job.error_count,
+        "errors": job.errors or [],
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+def run_worker(stop_event=None, poll_seconds: Optional[float] = None) -> None:
+    """Worker loop: process jobs until ``stop_event`` is set."""
+    poll_seconds = settings.job_poll_seconds if poll_seconds is None else poll_seconds
+    logging.basicConfig(level=settings.log_level, format=settings.log_format)
+    while stop_event is None or not stop_event.is_set():
+        try:
+            job_id = process_next_job()
+        except Exception:
+            logger.exception("Job worker error")
+            job_id = None
+        if job_id is None:
+            if stop_event is not None:
+                stop_event.wait(poll_seconds)
+            else:
+                time.sleep(poll_seconds)
+
+
+def start_worker_pool(workers: int):
+    """
+    Start ``workers`` worker processes.
+
+    Returns:
+        ``(processes, stop_event)`` for ``stop_worker_pool``
+    """
+    # spawn: children must not inherit the parent's DB connections or event loop
+    ctx = multiprocessing.get_context("spawn")
+    stop_event = ctx.Event()
+    processes = []
+    for i in range(workers):
+        process = ctx.Process(target=run_worker, args=(stop_event,), name=f"job-worker-{i}", daemon=True)
+        process.start()
+        processes.append(process)
+    logger.info(f"Started {workers} job worker process(es)")
+    return processes, stop_event
+
+
+def stop_worker_pool(processes, stop_event, timeout: float = 10.0) -> None:
+    """Signal the workers to stop after their current job and wait for them."""
+    stop_event.set()
+    for process in processes:
+        process.join(timeout)
+        if process.is_alive():
+            process.terminate()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--workers", type=int, default=max(settings.job_workers, 1))
+    args = parser.parse_args()
+
+    if args.workers == 1:
+        run_worker()
+    else:
+        processes, stop_event = start_worker_pool(args.workers)
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            stop_worker_pool(processes, stop_event)
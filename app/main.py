@@ -1,21 +1,77 @@
 import time
-from typing import List
-from fastapi import FastAPI, HTTPException, Query, Depends
+_import_started = time.perf_counter()
+
+import threading
+from pathlib import Path
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from fastapi import FastAPI, HTTPException, Query, Depends, File, Header, UploadFile
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
 # Import komponen database kita
-from .database import engine, get_db
-from . import models, schemas
+from .database import engine, get_db, warm_pool
+from . import models, schemas, stats, jobs, changes, shadow
 from .inference import ModelService
 from .config import settings
+from .auth import authenticate_user_async, create_access_token, get_current_user
+from .startup import startup_profile, import_breakdown
+from .migrations import check_schema
+
+startup_profile.record("import", time.perf_counter() - _import_started)
+
+# Model dimuat saat pertama kali dibutuhkan (pandas/xgboost ikut dimuat di sini),
+# jadi import app tetap ringan untuk cold start
+_model_service: Optional[ModelService] = None
+_model_service_lock = threading.Lock()
+_start_time = time.time()
+
+
+def get_model_service() -> ModelService:
+    global _model_service
+    if _model_service is None:
+        with _model_service_lock:
+            if _model_service is None:
+                with startup_profile.phase("artifact_load"):
+                    service = ModelService(settings.model_dir, engine=settings.model_engine)
+                    if settings.drift_monitor:
+                        service.drift_monitor = _load_drift_monitor(service)
+                    _model_service = service
+    return _model_service
+
+
+def _load_drift_monitor(service: ModelService):
+    from .drift import REFERENCE_FILE_NAME, DriftMonitor
+    
+    reference = Path(service._model_dir) / REFERENCE_FILE_NAME
+    if service.model_columns is None or not reference.exists():
+        return None
+    return DriftMonitor.load(reference, service.model_columns, settings.drift_batch_size)
 
-# --- AUTO CREATE TABLES ---
-# Baris ini akan otomatis membuat tabel di database jika belum ada
-# (Cara cepat tanpa ribet migrasi manual untuk tahap awal)
-models.Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title=settings.app_name)
+def warmup() -> None:
+    # Pre-open koneksi pool & jalankan satu prediksi dummy
+    with startup_profile.phase("warmup"):
+        warm_pool(settings.warmup_connections)
+        get_model_service().warmup()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings.check_secret_key()
+    # Skema dikelola lewat `python -m app.migrations`; di sini cukup cek versinya
+    with startup_profile.phase("schema_check"):
+        check_schema(engine)
+    if settings.warmup:
+        warmup()
+    worker_pool = jobs.start_worker_pool(settings.job_workers) if settings.job_workers > 0 else None
+    yield
+    if worker_pool is not None:
+        jobs.stop_worker_pool(*worker_pool)
+
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,10 +81,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# model_service = ModelService()  # Comment out for now to avoid model loading issues
-model_service = None  # Will initialize later
-_start_time = time.time()
-
 # --- Endpoints ---
 
 @app.get("/")
@@ -40,16 +92,18 @@ def health_check():
     return {"status": "ok", "uptime": int(time.time() - _start_time)}
 
 @app.post("/api/auth/login", response_model=schemas.LoginResponse)
-def login(payload: schemas.LoginRequest):
-    if payload.username == "sales_user_01" and payload.password == "password123":
-        return {
-            "token": "dummy-jwt-token",
-            "user": {"name": "Sales User", "username": payload.username}
-        }
-    raise HTTPException(status_code=401, detail="Invalid credentials")
+async def login(payload: schemas.LoginRequest):
+    # bcrypt jalan di thread pool khusus, event loop tetap bebas
+    user = await authenticate_user_async(payload.username, payload.password)
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    return {
+        "token": create_access_token({"sub": user["username"]}),
+        "user": {"name": user["name"], "username": user["username"]}
+    }
 
 # GET All Leads (Dari Database)
-@app.get("/leads", response_model=List[schemas.LeadListResponse])
+@app.get("/leads", response_model=List[schemas.LeadListResponse], dependencies=[Depends(get_current_user)])
 def get_leads(q: str = None, db: Session = Depends(get_db)):
     query = db.query(models.Lead)
     if q:
@@ -57,21 +111,54 @@ def get_leads(q: str = None, db: Session = Depends(get_db)):
         query = query.filter(models.Lead.customer_name.ilike(f"%{q}%"))
     return query.all()
 
+# GET Dashboard Stats (Dari tabel rollup, tidak scan semua leads)
+@app.get("/leads/stats", response_model=schemas.LeadStatsResponse, dependencies=[Depends(get_current_user)])
+def get_lead_stats(db: Session = Depends(get_db)):
+    return stats.get_lead_stats(db)
+
+# GET Change Feed: hanya event skor setelah cursor `since`, bukan seluruh tabel
+@app.get("/leads/changes", response_model=schemas.LeadChangesResponse, dependencies=[Depends(get_current_user)])
+def get_lead_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+):
+    return changes.get_changes(db, since, limit)
+
+# Live stream (Server-Sent Events); reconnect dengan header Last-Event-ID
+@app.get("/leads/changes/stream", dependencies=[Depends(get_current_user)])
+async def stream_lead_changes(
+    since: int = Query(0, ge=0),
+    last_event_id: Optional[int] = Header(None),
+):
+    cursor = max(since, last_event_id or 0)
+    return StreamingResponse(
+        changes.stream_changes(cursor, poll_seconds=settings.change_poll_seconds),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 # GET Lead Detail (Dari Database)
-@app.get("/leads/{lead_id}", response_model=schemas.LeadDetailResponse)
+@app.get("/leads/{lead_id}", response_model=schemas.LeadDetailResponse, dependencies=[Depends(get_current_user)])
 def get_lead_detail(lead_id: str, db: Session = Depends(get_db)):
-    lead = db.query(models.Lead).filter(models.Lead.id == lead_id).first()
+    # Profil ikut di-load dalam query yang sama (bukan lazy load kedua)
+    lead = (
+        db.query(models.Lead)
+        .options(joinedload(models.Lead.details))
+        .filter(models.Lead.id == lead_id)
+        .first()
+    )
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
     return lead
 
 # GET Notes
-@app.get("/notes", response_model=List[schemas.NoteResponse])
+@app.get("/notes", response_model=List[schemas.NoteResponse], dependencies=[Depends(get_current_user)])
 def get_notes(leadId: str, db: Session = Depends(get_db)):
     return db.query(models.Note).filter(models.Note.lead_id == leadId).all()
 
 # POST Create Note
-@app.post("/notes", response_model=schemas.NoteResponse)
+@app.post("/notes", response_model=schemas.NoteResponse, dependencies=[Depends(get_current_user)])
 def create_note(note: schemas.NoteCreate, db: Session = Depends(get_db)):
     # Pastikan lead-nya ada dulu
     lead = db.query(models.Lead).filter(models.Lead.id == note.leadId).first()
@@ -94,20 +181,108 @@ def create_note(note: schemas.NoteCreate, db: Session = Depends(get_db)):
 # Predict Endpoint (Tetap sama)
 @app.post("/predict", response_model=schemas.PredictResponse)
 def predict_lead_score(payload: schemas.PredictRequest):
+    model_service = get_model_service()
+    unknown, missing = [], []
+    features = payload.features
+    if payload.lead is not None:
+        # Lead mentah -> kolom model (one-hot, pernah_dihubungi, dst.)
+        features, unknown, missing = model_service.encode_lead(payload.lead.model_dump())
+    
+    started = time.perf_counter()
     try:
-        probability = model_service.predict(payload.features)
-        score = int(round(probability * 100))
-        return {
-            "probability": probability,
-            "score": score,
-            "model_version": model_service.model_version
-        }
+        result = model_service.score(features=features, values=payload.values)
+    except ValueError as exc:
+        # Input tidak valid dilaporkan, bukan ditutupi dengan skor 0.5
+        raise HTTPException(status_code=422, detail=str(exc))
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc))
+    latency_ms = (time.perf_counter() - started) * 1000
+    probability = result["probability"]
     
+    # Model kandidat (jika ada) menilai request yang sama di background
+    evaluator = shadow.get_shadow()
+    if evaluator is not None:
+        if features is None:
+            features = dict(zip(model_service.expected_features, payload.values))
+        evaluator.submit(features, probability, latency_ms)
+    
+    score = int(round(probability * 100))
+    return {
+        "probability": probability,
+        "score": score,
+        "model_version": model_service.model_version,
+        "unknown_features": unknown + result["unknown_features"],
+        "missing_features": missing + result["missing_features"],
+    }
+
 @app.get("/metadata", response_model=schemas.MetadataResponse)
 def get_model_metadata():
+    model_service = get_model_service()
     return {
         "model_version": model_service.model_version,
         "features": model_service.expected_features
-    }
\ No newline at end of file
+    }
+
+# Startup profile (aktif jika STARTUP_PROFILE=true atau DEBUG=true)
+@app.get("/debug/startup")
+def get_startup_profile(importtime: bool = False):
+    if not (settings.startup_profile or settings.debug):
+        raise HTTPException(status_code=404, detail="Not Found")
+    report = startup_profile.report()
+    if importtime:
+        # Import ulang di interpreter baru dengan -X importtime
+        report["imports"] = import_breakdown()
+    return report
+
+# --- Background Jobs ---
+# File besar diproses worker di background; API cukup simpan file & antrekan
+
+def _enqueue(kind: str, file: UploadFile, db: Session):
+    job = jobs.enqueue_job(db, kind, file.file, file.filename)
+    return jobs.job_progress(job)
+
+@app.post("/jobs/score", response_model=schemas.JobResponse, status_code=202, dependencies=[Depends(get_current_user)])
+def create_score_job(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    return _enqueue("score", file, db)
+
+@app.post("/jobs/import", response_model=schemas.JobResponse, status_code=202, dependencies=[Depends(get_current_user)])
+def create_import_job(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    return _enqueue("import", file, db)
+
+@app.get("/jobs/{job_id}", response_model=schemas.JobResponse, dependencies=[Depends(get_current_user)])
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    job = db.get(models.Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return jobs.job_progress(job)
+
+# Hasil scoring (CSV input + kolom probability & score)
+@app.get("/jobs/{job_id}/result", dependencies=[Depends(get_current_user)])
+def get_job_result(job_id: int, db: Session = Depends(get_db)):
+    job = db.get(models.Job, job_id)
+    if not job or job.kind != "score":
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    return FileResponse(job.result_path, media_type="text/csv", filename=f"job-{job.id}-scores.csv")
+
+# --- Shadow / A-B Evaluation ---
+@app.get("/admin/shadow", dependencies=[Depends(get_current_user)])
+def get_shadow_summary():
+    evaluator = shadow.get_shadow()
+    if evaluator is None:
+        return {"enabled": False}
+    return evaluator.summary()
+
+# --- Drift Monitoring ---
+# Perbandingan distribusi fitur yang masuk vs data training (PSI / KS)
+@app.get("/metrics/drift")
+def get_drift_metrics(format: str = Query("json", pattern="^(json|prometheus)$")):
+    monitor = get_model_service().drift_monitor
+    if monitor is None:
+        return {"enabled": False}
+    report = monitor.report()
+    if format == "prometheus":
+        from .drift import to_prometheus
+        return PlainTextResponse(to_prometheus(report))
+    return {"enabled": True, **report}
@@ -0,0 +1,306 @@
+"""
+Database schema migrations
+
+Schema changes are applied explicitly with::
+
+    python -m app.migrations
+
+instead of ``create_all`` on every worker start. The API only runs
+``check_schema`` at startup, a single query against ``schema_version``.
+
+Each migration is a function taking a connection; append new ones to
+``MIGRATIONS`` and never edit ones that have already shipped.
+
+On Postgres ``migrate`` holds an advisory lock, so concurrent runs apply
+each migration once; the others wait and then find nothing pending.
+"""
+
+import logging
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import (
+    Column, DateTime, Float, ForeignKey, Index, Integer, JSON, MetaData, String, Table,
+    inspect, select, text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.sql import func
+
+from .database import engine as default_engine
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaOutdatedError(RuntimeError):
+    """Raised when the database schema is older than the code expects."""
+
+
+def _0001_initial(conn: Connection) -> None:
+    """Tables previously created by ``create_all`` (kept as a snapshot)."""
+    metadata = MetaData()
+    Table(
+        "leads", metadata,
+        Column("id", String, primary_key=True, index=True),
+        Column("customer_name", String, index=True),
+        Column("probability_score", Float),
+        Column("score", Integer),
+        Column("job", String),
+        Column("loan_status", String),
+        Column("key_information", JSON),
+        Column("demographic_profile", JSON),
+        Column("financial_profile", JSON),
+        Column("campaign_history", JSON),
+        Column("created_at", DateTime(timezone=True), server_default=func.now()),
+        Column("updated_at", DateTime(timezone=True)),
+    )
+    Table(
+        "notes", metadata,
+        Column("id", Integer, primary_key=True, index=True, autoincrement=True),
+        Column("lead_id", String, ForeignKey("leads.id")),
+        Column("note", String),
+        Column("timestamp", DateTime(timezone=True), server_default=func.now()),
+    )
+    Table(
+        "lead_stats_rollup", metadata,
+        Column("dimension", String, primary_key=True),
+        Column("bucket", String, primary_key=True),
+        Column("lead_count", Integer, nullable=False),
+        Column("probability_sum", Float, nullable=False),
+    )
+    # Existing deployments already have these from create_all
+    metadata.create_all(bind=conn, checkfirst=True)
+
+
+def _0002_jobs(conn: Connection) -> None:
+    """Background job queue table."""
+    metadata = MetaData()
+    Table(
+        "jobs", metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("kind", String, nullable=False),
+        Column("status", String, nullable=False),
+        Column("filename", String),
+        Column("input_path", String, nullable=False),
+        Column("result_path", String),
+        Column("worker", String),
+        Column("total_rows", Integer),
+        Column("processed_rows", Integer, nullable=False),
+        Column("error_count", Integer, nullable=False),
+        Column("errors", JSON),
+        Column("created_at", DateTime(timezone=True), server_default=func.now()),
+        Column("started_at", DateTime(timezone=True)),
+        Column("finished_at", DateTime(timezone=True)),
+        Index("ix_jobs_status_id", "status", "id"),
+    )
+    metadata.create_all(bind=conn)
+
+
+def _0003_lead_score_events(conn: Connection) -> None:
+    """Change-data feed of lead score updates."""
+    metadata = MetaData()
+    Table(
+        "lead_score_events", metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("lead_id", String, nullable=False, index=True),
+        Column("event", String, nullable=False),
+        Column("probability_score", Float),
+        Column("score", Integer),
+        Column("previous_score", Integer),
+        Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    )
+    metadata.create_all(bind=conn)
+
+
+_OLD_PROFILE_COLUMNS = ("demographic_profile", "financial_profile", "campaign_history")
+
+
+def _0004_lead_profiles(conn: Connection) -> None:
+    """
+    Move the lead profile JSON columns into ``lead_profiles`` (one JSONB
+    document per lead) and drop ``key_information``, which only repeated
+    id, name and score.
+
+    ``leads`` keeps only the columns list queries read. On Postgres the
+    dropped columns still occupy the heap until ``VACUUM FULL leads``.
+    """
+    metadata = MetaData()
+    Table("leads", metadata, Column("id", String, primary_key=True))
+    Table(
+        "lead_profiles", metadata,
+        Column("lead_id", String, ForeignKey("leads.id", ondelete="CASCADE"), primary_key=True),
+        Column("profile", JSON().with_variant(JSONB(), "postgresql")),
+    )
+    metadata.tables["lead_profiles"].create(bind=conn)
+
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(
+            "INSERT INTO lead_profiles (lead_id, profile) "
+            "SELECT id, jsonb_build_object("
+            "'demographic', demographic_profile::jsonb, "
+            "'financial', financial_profile::jsonb, "
+            "'campaign', campaign_history::jsonb) "
+            "FROM leads WHERE COALESCE(demographic_profile::text, financial_profile::text, "
+            "campaign_history::text) IS NOT NULL"
+        ))
+        conn.execute(text(
+            "ALTER TABLE leads "
+            + ", ".join(f"DROP COLUMN {col}" for col in ("key_information",) + _OLD_PROFILE_COLUMNS)
+        ))
+    else:
+        conn.execute(text(
+            "INSERT INTO lead_profiles (lead_id, profile) "
+            "SELECT id, json_object("
+            "'demographic', json(demographic_profile), "
+            "'financial', json(financial_profile), "
+            "'campaign', json(campaign_history)) "
+            "FROM leads WHERE COALESCE(demographic_profile, financial_profile, campaign_history) IS NOT NULL"
+        ))
+        for col in ("key_information",) + _OLD_PROFILE_COLUMNS:
+            conn.execute(text(f"ALTER TABLE leads DROP COLUMN {col}"))
+
+
+def _0005_job_heartbeat(conn: Connection) -> None:
+    """Lease column so jobs of dead workers can be reclaimed."""
+    column_type = DateTime(timezone=True).compile(dialect=conn.dialect)
+    conn.execute(text(f"ALTER TABLE jobs ADD COLUMN heartbeat_at {column_type}"))
+
+
+def _0006_backfill_lead_stats(conn: Connection) -> None:
+    """
+    Fill ``lead_stats_rollup`` from existing leads.
+
+    0001 created the rollup empty on deployments that already had leads;
+    the flush listeners only track changes made after that.
+    """
+    from .stats import aggregate_lead_stats
+
+    rollup = Table(
+        "lead_stats_rollup", MetaData(),
+        Column("dimension", String, primary_key=True),
+        Column("bucket", String, primary_key=True),
+        Column("lead_count", Integer, nullable=False),
+        Column("probability_sum", Float, nullable=False),
+    )
+    rows = aggregate_lead_stats(
+        conn.execute(text("SELECT score, probability_score, job, loan_status FROM leads"))
+    )
+    conn.execute(rollup.delete())
+    if rows:
+        conn.execute(rollup.insert(), rows)
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "initial", _0001_initial),
+    (2, "jobs", _0002_jobs),
+    (3, "lead_score_events", _0003_lead_score_events),
+    (4, "lead_profiles", _0004_lead_profiles),
+    (5, "job_heartbeat", _0005_job_heartbeat),
+    (6, "backfill_lead_stats", _0006_backfill_lead_stats),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+_version_metadata = MetaData()
+schema_version_table = Table(
+    "schema_version", _version_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+def current_version(conn: Connection) -> int:
+    """Highest applied migration, 0 for an unmanaged database."""
+    if not inspect(conn).has_table(schema_version_table.name):
+        return 0
+    return conn.execute(select(func.max(schema_version_table.c.version))).scalar() or 0
+
+
+# Arbitrary constant key for pg_advisory_lock
+_MIGRATION_LOCK_KEY = 720452
+
+
+@contextmanager
+def _migration_lock(engine: Engine):
+    """Serialize concurrent ``migrate`` runs (Postgres only)."""
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    with engine.connect() as conn:
+        # Session-level lock: held across the per-migration transactions below
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _MIGRATION_LOCK_KEY})
+        conn.commit()
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _MIGRATION_LOCK_KEY})
+            conn.commit()
+
+
+def migrate(engine: Engine = default_engine, target: Optional[int] = None) -> int:
+    """
+    Apply all pending migrations, each in its own transaction.
+
+    Args:
+        engine: Database to migrate
+        target: Stop after this version (default: the latest)
+
+    Returns:
+        The schema version after migrating
+    """
+    with _migration_lock(engine):
+        # Read the version only once the lock is held: another run may have just migrated
+        with engine.begin() as conn:
+            _version_metadata.create_all(bind=conn, checkfirst=True)
+            version = current_version(conn)
+
+        for number, name, upgrade in MIGRATIONS:
+            if number <= version:
+                continue
+            if target is not None and number > target:
+                break
+            logger.info(f"Applying migration {number:04d}_{name}")
+            with engine.begin() as conn:
+                upgrade(conn)
+                conn.execute(schema_version_table.insert().values(version=number, name=name))
+            version = number
+
+    logger.info(f"Database schema at version {version}")
+    return version
+
+
+def check_schema(engine: Engine = default_engine) -> int:
+    """
+    Fail fast if migrations are pending.
+
+    Runs a single query against ``schema_version``, no catalog scans.
+
+    Raises:
+        SchemaOutdatedError: If the database is behind ``SCHEMA_VERSION``
+    """
+    with engine.connect() as conn:
+        try:
+            version = conn.execute(select(func.max(schema_version_table.c.version))).scalar() or 0
+        except (OperationalError, ProgrammingError):
+            # schema_version table does not exist yet
+            version = 0
+
+    if version < SCHEMA_VERSION:
+        raise SchemaOutdatedError(
+            f"Database schema is at version {version}, expected {SCHEMA_VERSION}. "
+            f"Run `python -m app.migrations` first."
+        )
+    return version
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Apply database schema migrations")
+    parser.add_argument("--to", type=int, default=None, help="stop after this version")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    migrate(target=args.to)
@@ -1,7 +1,12 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, ForeignKey, Index, event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
 
+# JSONB di Postgres (biner, dikompresi via TOAST), JSON biasa di SQLite
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
 class Lead(Base):
     __tablename__ = "leads"
 
@@ -13,19 +18,109 @@ class Lead(Base):
     job = Column(String)
     loan_status = Column(String)
     
-    # Kolom JSON untuk data kompleks
-    key_information = Column(JSON)
-    demographic_profile = Column(JSON)
-    financial_profile = Column(JSON)
-    campaign_history = Column(JSON)
-
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Detail profil ada di tabel lead_profiles: query list (/leads) tidak
+    # pernah membaca maupun men-decode JSON-nya; di-load saat diakses saja
+    details = relationship("LeadProfile", uselist=False, lazy="select", cascade="all, delete-orphan")
+
+    @property
+    def profile(self):
+        return self.details.profile if self.details is not None else None
+
+    # Bentuk lama tetap tersedia untuk response detail (hanya dibaca)
+    @property
+    def key_information(self):
+        # Tidak disimpan lagi: semuanya sudah ada di kolom utama
+        return {
+            "customer_id": self.id,
+            "customer_name": self.customer_name,
+            "probability_score": self.score,
+            "status_target": "yes" if (self.score or 0) > 50 else "no",
+        }
+
+    @property
+    def demographic_profile(self):
+        return (self.profile or {}).get("demographic")
+
+    @property
+    def financial_profile(self):
+        return (self.profile or {}).get("financial")
+
+    @property
+    def campaign_history(self):
+        return (self.profile or {}).get("campaign")
+
+def _load_old_value(target, value, oldvalue, initiator):
+    pass
+
+# Muat nilai lama saat di-assign (juga untuk instance yang sudah expired), supaya
+# listener rollup (app.stats) & change feed (app.changes) tahu nilai sebelumnya
+for _attr in ("score", "probability_score", "job", "loan_status"):
+    event.listen(getattr(Lead, _attr), "set", _load_old_value, active_history=True)
+
+class LeadProfile(Base):
+    """Profile of a lead, one JSONB document: ``{"demographic", "financial", "campaign"}``."""
+    __tablename__ = "lead_profiles"
+
+    lead_id = Column(String, ForeignKey("leads.id", ondelete="CASCADE"), primary_key=True)
+    # Satu nilai per lead: dikompresi bersama & satu kali de-TOAST saat dibaca
+    profile = Column(JSONType)
+
 class Note(Base):
     __tablename__ = "notes"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     lead_id = Column(String, ForeignKey("leads.id")) 
     note = Column(String)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+
+class LeadStatsRollup(Base):
+    """Pre-aggregated lead counts, maintained incrementally by ``app.stats``."""
+    __tablename__ = "lead_stats_rollup"
+
+    # dimension: "score_bucket" | "job" | "loan_status"
+    dimension = Column(String, primary_key=True)
+    bucket = Column(String, primary_key=True)
+    lead_count = Column(Integer, nullable=False, default=0)
+    probability_sum = Column(Float, nullable=False, default=0.0)
+
+
+class Job(Base):
+    """Background scoring/import job; the table doubles as the work queue (see ``app.jobs``)."""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String, nullable=False)  # "score" | "import"
+    status = Column(String, nullable=False, default="queued")  # queued | running | done | failed
+    filename = Column(String)
+    input_path = Column(String, nullable=False)
+    result_path = Column(String)
+    worker = Column(String)
+
+    total_rows = Column(Integer)
+    processed_rows = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    errors = Column(JSON)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    # Lease: refreshed at every chunk commit, stale -> reclaimable
+    heartbeat_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (Index("ix_jobs_status_id", "status", "id"),)
+
+
+class LeadScoreEvent(Base):
+    """Append-only log of lead score changes; ``id`` is the consumer cursor (see ``app.changes``)."""
+    __tablename__ = "lead_score_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    lead_id = Column(String, nullable=False, index=True)
+    event = Column(String, nullable=False)  # "created" | "rescored"
+    probability_score = Column(Float)
+    score = Column(Integer)
+    previous_score = Column(Integer)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
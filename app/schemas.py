@@ -1,6 +1,6 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Literal, Optional, Union
 from datetime import datetime
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
 
 # --- Common/Shared Schemas ---
 class NoteBase(BaseModel):
@@ -31,8 +31,76 @@ class NoteResponse(BaseModel):
 
 
 # --- ML & System Schemas ---
+YesNo = Literal["yes", "no", "unknown"]
+
+class LeadFeatures(BaseModel):
+    """
+    One raw lead, as a row of ``bank.csv`` (plus the ``bank-additional``
+    columns the model was trained on, see ``NasabahData`` in ``ml/app.py``).
+
+    Categorical values are checked against the levels of both datasets;
+    unknown fields are rejected. Optional fields that the model uses are
+    reported back as ``missing_features`` when omitted.
+    """
+    model_config = ConfigDict(extra="forbid", populate_by_name=True)
+
+    age: int = Field(ge=0, le=120)
+    job: Literal[
+        "admin.", "blue-collar", "entrepreneur", "housemaid", "management", "retired",
+        "self-employed", "services", "student", "technician", "unemployed", "unknown",
+    ]
+    marital: Literal["married", "single", "divorced", "unknown"]
+    education: Literal[
+        # bank.csv
+        "primary", "secondary", "tertiary",
+        # bank-additional
+        "basic.4y", "basic.6y", "basic.9y", "high.school", "illiterate",
+        "professional.course", "university.degree", "unknown",
+    ]
+    default: YesNo
+    housing: YesNo
+    loan: YesNo
+    contact: Literal["cellular", "telephone", "unknown"]
+    month: Literal["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+    campaign: int = Field(ge=0)
+    # -1 (bank.csv) atau 999 (bank-additional) = belum pernah dihubungi
+    pdays: int = Field(ge=-1)
+    previous: int = Field(ge=0)
+    poutcome: Literal["failure", "success", "nonexistent", "unknown", "other"]
+
+    # Hanya ada di bank.csv, tidak dipakai model
+    balance: Optional[float] = None
+    day: Optional[int] = Field(default=None, ge=1, le=31)
+    duration: Optional[int] = Field(default=None, ge=0)
+
+    # Hanya ada di bank-additional (dipakai model)
+    day_of_week: Optional[Literal["mon", "tue", "wed", "thu", "fri"]] = None
+    emp_var_rate: Optional[float] = Field(default=None, alias="emp.var.rate")
+    cons_price_idx: Optional[float] = Field(default=None, alias="cons.price.idx")
+    cons_conf_idx: Optional[float] = Field(default=None, alias="cons.conf.idx")
+    euribor3m: Optional[float] = None
+    nr_employed: Optional[float] = Field(default=None, alias="nr.employed")
+
 class PredictRequest(BaseModel):
-    features: Dict[str, Any]
+    """
+    Exactly one of:
+
+    - ``lead``: typed raw lead, encoded server-side
+    - ``values``: one number per model column, in ``/metadata`` order
+    - ``features``: already encoded model columns by name
+    """
+    model_config = ConfigDict(extra="forbid")
+
+    lead: Optional[LeadFeatures] = None
+    values: Optional[List[float]] = None
+    features: Optional[Dict[str, Union[float, str, None]]] = None
+
+    @model_validator(mode="after")
+    def _exactly_one_form(self):
+        given = [name for name in ("lead", "values", "features") if getattr(self, name) is not None]
+        if len(given) != 1:
+            raise ValueError("Provide exactly one of 'lead', 'values' or 'features'")
+        return self
 
 class PredictResponse(BaseModel):
     model_config = {"protected_namespaces": ()}
@@ -40,6 +108,9 @@ class PredictResponse(BaseModel):
     probability: float
     score: int
     model_version: str
+    # Input yang tidak dikenal model / kolom model yang tidak diisi (diisi 0)
+    unknown_features: List[str] = []
+    missing_features: List[str] = []
 
 class HealthResponse(BaseModel):
     status: str
@@ -111,4 +182,57 @@ class LeadDetailResponse(BaseModel):
     financial_profile: Optional[Any] = None
     campaign_history: Optional[Any] = None
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+# --- Dashboard Stats Schemas ---
+class ScoreBucket(BaseModel):
+    bucket: str
+    count: int
+
+class JobStats(BaseModel):
+    job: str
+    count: int
+    avg_probability: float
+
+class LoanStatusStats(BaseModel):
+    loan_status: str
+    count: int
+
+class LeadStatsResponse(BaseModel):
+    total_leads: int
+    score_histogram: List[ScoreBucket]
+    jobs: List[JobStats]
+    loan_status: List[LoanStatusStats]
+
+
+# --- Background Job Schemas ---
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: str
+    filename: Optional[str] = None
+    total_rows: Optional[int] = None
+    processed_rows: int
+    percent_complete: Optional[float] = None
+    rows_per_sec: Optional[float] = None
+    error_count: int
+    errors: List[str] = []
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+# --- Change Feed Schemas ---
+class LeadScoreEventResponse(BaseModel):
+    cursor: int
+    lead_id: str
+    event: str
+    probability_score: Optional[float] = None
+    score: Optional[int] = None
+    previous_score: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+class LeadChangesResponse(BaseModel):
+    events: List[LeadScoreEventResponse]
+    next_cursor: int
+    has_more: bool
@@ -0,0 +1,201 @@
+"""
+Shadow model evaluation
+
+Scores live ``/predict`` traffic with a candidate model next to the primary
+``ModelService`` without touching the request path: the primary result is
+returned first, the candidate runs later on a single background thread.
+Score deltas and per-model latencies go into a fixed-size ring buffer
+summarised at ``/admin/shadow``.
+
+Shadow compute is capped two ways: ``SHADOW_SAMPLE_RATE`` picks the share
+of requests that are shadowed, and at most ``SHADOW_MAX_PENDING`` requests
+may wait for the candidate; anything beyond that is dropped and counted.
+Score jobs run in separate worker processes and are not shadowed.
+"""
+
+import logging
+import random
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RingBuffer:
+    """Fixed-capacity float32 columns; the oldest rows are overwritten."""
+
+    def __init__(self, capacity: int, fields: Sequence[str]):
+        self.capacity = capacity
+        self.fields = tuple(fields)
+        self._columns = {name: array("f", bytes(4 * capacity)) for name in self.fields}
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def append(self, **values: float) -> None:
+        with self._lock:
+            for name in self.fields:
+                self._columns[name][self._next] = values[name]
+            self._next = (self._next + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def column(self, name: str) -> List[float]:
+        with self._lock:
+            return list(self._columns[name][:self._size])
+
+    def __len__(self) -> int:
+        return self._size
+
+
+def _percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _summary(values: List[float]) -> Dict[str, Optional[float]]:
+    ordered = sorted(values)
+    return {
+        "mean": sum(ordered) / len(ordered) if ordered else None,
+        "p50": _percentile(ordered, 0.50),
+        "p95": _percentile(ordered, 0.95),
+        "max": ordered[-1] if ordered else None,
+    }
+
+
+class ShadowEvaluator:
+    """Runs a candidate ModelService off the critical path and records deltas."""
+
+    def __init__(
+        self,
+        model_dir: str,
+        engine: str = "xgboost",
+        sample_rate: float = 1.0,
+        max_pending: int = 8,
+        buffer_size: int = 10000,
+    ):
+        self.model_dir = model_dir
+        self.engine = engine
+        self.sample_rate = sample_rate
+        self.max_pending = max_pending
+        self.candidate = None
+
+        self.buffer = RingBuffer(
+            buffer_size, ("primary", "delta", "primary_latency_ms", "shadow_latency_ms")
+        )
+        self.submitted = 0
+        self.dropped = 0
+        self.failed = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        # One thread: the candidate never uses more than one core
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+
+    def submit(self, features: Dict[str, Any], primary: float, primary_latency_ms: float) -> bool:
+        """
+        Queue one prediction for shadow scoring; never blocks.
+
+        Args:
+            features: Encoded model columns, as scored by the primary
+            primary: Primary model probability
+            primary_latency_ms: Primary model time
+
+        Returns:
+            True if the prediction was queued, False if sampled out or dropped
+        """
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return False
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.dropped += 1
+                return False
+            self._pending += 1
+            self.submitted += 1
+        self._executor.submit(self._score, features, primary, primary_latency_ms)
+        return True
+
+    def _load_candidate(self):
+        if self.candidate is None:
+            from .inference import ModelService
+            self.candidate = ModelService(self.model_dir, engine=self.engine)
+            if hasattr(self.candidate.model, "set_params"):
+                # Keep XGBoost's own thread pool to one core as well
+                self.candidate.model.set_params(n_jobs=1)
+            logger.info(f"Shadow model loaded from {self.model_dir} ({self.candidate.model_version})")
+        return self.candidate
+
+    def _score(self, features: Dict[str, Any], primary: float, primary_latency_ms: float) -> None:
+        try:
+            candidate = self._load_candidate()
+            start = time.perf_counter()
+            # Same strict path as the primary: bad input counts as a failure, not 0.5
+            shadow = candidate.score(features=features)["probability"]
+            self.buffer.append(
+                primary=primary,
+                delta=shadow - primary,
+                primary_latency_ms=primary_latency_ms,
+                shadow_latency_ms=(time.perf_counter() - start) * 1000,
+            )
+        except Exception as e:
+            logger.warning(f"Shadow scoring failed: {e}")
+            with self._lock:
+                self.failed += 1
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate statistics over the rows currently in the ring buffer."""
+        primary = self.buffer.column("primary")
+        deltas = self.buffer.column("delta")
+        candidate = self.candidate
+        return {
+            "enabled": True,
+            "candidate_model_dir": self.model_dir,
+            "candidate_version": candidate.model_version if candidate else None,
+            "samples": len(deltas),
+            "submitted_batches": self.submitted,
+            "dropped_batches": self.dropped,
+            "failed_batches": self.failed,
+            "pending_batches": self._pending,
+            "delta": _summary(deltas),
+            "abs_delta": _summary([abs(d) for d in deltas]),
+            # Share of rows where both models land on the same side of 0.5
+            "agreement": (
+                sum(1 for p, d in zip(primary, deltas) if (p + d >= 0.5) == (p >= 0.5)) / len(deltas)
+                if deltas else None
+            ),
+            "primary_latency_ms": _summary(self.buffer.column("primary_latency_ms")),
+            "shadow_latency_ms": _summary(self.buffer.column("shadow_latency_ms")),
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_shadow: Optional[ShadowEvaluator] = None
+_shadow_lock = threading.Lock()
+
+
+def get_shadow() -> Optional[ShadowEvaluator]:
+    """The process-wide evaluator, or None if ``SHADOW_MODEL_DIR`` is not set."""
+    global _shadow
+    if not settings.shadow_model_dir:
+        return None
+    if _shadow is None:
+        with _shadow_lock:
+            if _shadow is None:
+                _shadow = ShadowEvaluator(
+                    settings.shadow_model_dir,
+                    engine=settings.shadow_engine,
+                    sample_rate=settings.shadow_sample_rate,
+                    max_pending=settings.shadow_max_pending,
+                    buffer_size=settings.shadow_buffer_size,
+                )
+    return _shadow
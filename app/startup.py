@@ -0,0 +1,120 @@
+"""
+Startup profiling utilities
+
+This module records how long the cold-start phases take (imports,
+DB metadata, model artifact loading) and can break the import phase
+down per module using ``python -X importtime``.
+
+Run ``python -m app.startup`` for a report on the command line.
+"""
+
+import os
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+# Lines look like: "import time:       689 |    1312348 |     xgboost"
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+class StartupProfile:
+    """Collects wall-clock durations of named startup phases."""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add ``seconds`` to phase ``name``."""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as phase ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def report(self) -> Dict[str, Any]:
+        """Phase durations in milliseconds plus their total."""
+        phases_ms = {name: round(seconds * 1000, 2) for name, seconds in self.phases.items()}
+        return {
+            "phases_ms": phases_ms,
+            "total_ms": round(sum(phases_ms.values()), 2),
+        }
+
+
+startup_profile = StartupProfile()
+
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    """
+    Parse ``-X importtime`` stderr output.
+
+    Returns:
+        One dict per imported module with self/cumulative time in
+        microseconds and the nesting depth.
+    """
+    entries = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        entries.append({
+            "module": module,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            "depth": (len(indent) - 1) // 2,
+        })
+    return entries
+
+
+def measure_import(module: str = "app.main", env: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+    """Import ``module`` in a fresh interpreter with ``-X importtime`` and parse the result."""
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=project_root,
+        env={**os.environ, **(env or {})},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def import_breakdown(module: str = "app.main", top: int = 15) -> Dict[str, Any]:
+    """Cumulative import time of ``module`` and its slowest top-level dependencies."""
+    entries = measure_import(module)
+    target = None
+    children: List[Dict[str, Any]] = []
+    # importtime prints children before their parent
+    for entry in entries:
+        if entry["depth"] == 1:
+            children.append(entry)
+        elif entry["depth"] == 0:
+            if entry["module"] == module:
+                target = entry
+                break
+            children = []
+    top_level = sorted(children, key=lambda e: e["cumulative_us"], reverse=True)
+    return {
+        "module": module,
+        "cumulative_ms": round(target["cumulative_us"] / 1000, 2) if target else None,
+        "slowest": [
+            {"module": e["module"], "cumulative_ms": round(e["cumulative_us"] / 1000, 2)}
+            for e in top_level[:top]
+        ],
+    }
+
+
+if __name__ == "__main__":
+    breakdown = import_breakdown()
+    print(f"import {breakdown['module']}: {breakdown['cumulative_ms']} ms")
+    for entry in breakdown["slowest"]:
+        print(f"  {entry['cumulative_ms']:>10.2f} ms  {entry['module']}")
@@ -0,0 +1,210 @@
+"""
+Dashboard statistics rollups
+
+This module keeps the ``lead_stats_rollup`` table in sync with ``leads``
+so that ``/leads/stats`` only reads a handful of pre-aggregated rows
+instead of scanning every lead.
+"""
+
+import logging
+from collections import defaultdict
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+SCORE_BUCKET = "score_bucket"
+JOB = "job"
+LOAN_STATUS = "loan_status"
+
+# Histogram bins of 10 score points; 100 falls into the last bin
+SCORE_BUCKETS = [f"{i * 10}-{i * 10 + 9}" if i < 9 else "90-100" for i in range(10)]
+
+_TRACKED_ATTRS = ("score", "probability_score", "job", "loan_status")
+_PENDING_KEY = "lead_stats_pending"
+
+DeltaKey = Tuple[str, str]
+
+
+def score_bucket(score: Optional[int]) -> str:
+    """Map a 0-100 score to its histogram bucket label."""
+    index = min(max(int(score or 0), 0) // 10, 9)
+    return SCORE_BUCKETS[index]
+
+
+def _contributions(score, probability, job, loan_status):
+    probability = float(probability or 0.0)
+    yield (SCORE_BUCKET, score_bucket(score)), probability
+    yield (JOB, job or "unknown"), probability
+    yield (LOAN_STATUS, loan_status or "unknown"), probability
+
+
+def _add(deltas: Dict[DeltaKey, list], values, sign: int) -> None:
+    for key, probability in _contributions(*values):
+        deltas[key][0] += sign
+        deltas[key][1] += sign * probability
+
+
+def _current_values(lead: models.Lead):
+    return tuple(getattr(lead, attr) for attr in _TRACKED_ATTRS)
+
+
+def _committed_values(lead: models.Lead):
+    # History of expired leads is complete thanks to the active_history listener in models
+    state = inspect(lead)
+    values = []
+    for attr in _TRACKED_ATTRS:
+        history = state.attrs[attr].history
+        values.append(history.deleted[0] if history.deleted else getattr(lead, attr))
+    return tuple(values)
+
+
+def _collect_deltas(session: Session, flush_context, instances) -> None:
+    """Accumulate rollup deltas for leads created, rescored or deleted in this flush."""
+    deltas = session.info.setdefault(_PENDING_KEY, defaultdict(lambda: [0, 0.0]))
+
+    for obj in session.new:
+        if isinstance(obj, models.Lead):
+            _add(deltas, _current_values(obj), +1)
+
+    for obj in session.deleted:
+        if isinstance(obj, models.Lead):
+            _add(deltas, _committed_values(obj), -1)
+
+    for obj in session.dirty:
+        if not isinstance(obj, models.Lead):
+            continue
+        state = inspect(obj)
+        if not any(state.attrs[attr].history.has_changes() for attr in _TRACKED_ATTRS):
+            continue
+        _add(deltas, _committed_values(obj), -1)
+        _add(deltas, _current_values(obj), +1)
+
+
+def _upsert_statement(bind, dimension: str, bucket: str, count: int, probability: float):
+    if bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    table = models.LeadStatsRollup.__table__
+    stmt = insert(table).values(
+        dimension=dimension,
+        bucket=bucket,
+        lead_count=count,
+        probability_sum=probability,
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.dimension, table.c.bucket],
+        set_={
+            "lead_count": table.c.lead_count + stmt.excluded.lead_count,
+            "probability_sum": table.c.probability_sum + stmt.excluded.probability_sum,
+        },
+    )
+
+
+def _apply_deltas(session: Session, flush_context) -> None:
+    """Write the accumulated deltas as atomic upserts inside the flush transaction."""
+    deltas = session.info.pop(_PENDING_KEY, None)
+    if not deltas:
+        return
+
+    connection = session.connection()
+    for (dimension, bucket), (count, probability) in deltas.items():
+        if count == 0 and probability == 0.0:
+            continue
+        connection.execute(_upsert_statement(connection, dimension, bucket, count, probability))
+
+
+def _discard_deltas(session: Session, previous_transaction) -> None:
+    """Drop deltas of a flush that failed; they must not leak into the next one."""
+    session.info.pop(_PENDING_KEY, None)
+
+
+def register(session_factory=SessionLocal) -> None:
+    """Attach the rollup listeners to a session factory (idempotent)."""
+    if not event.contains(session_factory, "before_flush", _collect_deltas):
+        event.listen(session_factory, "before_flush", _collect_deltas)
+        event.listen(session_factory, "after_flush", _apply_deltas)
+        event.listen(session_factory, "after_soft_rollback", _discard_deltas)
+
+
+def aggregate_lead_stats(rows: Iterable[Tuple]) -> List[Dict[str, Any]]:
+    """
+    Rollup rows for ``(score, probability_score, job, loan_status)`` lead tuples.
+
+    Returns:
+        ``lead_stats_rollup`` rows as column dicts
+    """
+    deltas: Dict[DeltaKey, list] = defaultdict(lambda: [0, 0.0])
+    for row in rows:
+        _add(deltas, tuple(row), +1)
+    return [
+        {"dimension": dimension, "bucket": bucket, "lead_count": count, "probability_sum": probability}
+        for (dimension, bucket), (count, probability) in deltas.items()
+    ]
+
+
+def rebuild_lead_stats(db: Session) -> int:
+    """
+    Recompute the whole rollup table from ``leads``.
+
+    Migration 0006 backfills existing deployments; regular imports and
+    rescoring keep the rollup up to date incrementally, so this is only a
+    repair tool.
+
+    Returns:
+        Number of leads aggregated
+    """
+    lead = models.Lead
+    rows = db.query(lead.score, lead.probability_score, lead.job, lead.loan_status).all()
+
+    db.query(models.LeadStatsRollup).delete()
+    db.add_all(models.LeadStatsRollup(**values) for values in aggregate_lead_stats(rows))
+    db.commit()
+    logger.info(f"Rebuilt lead stats rollup from {len(rows)} leads")
+    return len(rows)
+
+
+def get_lead_stats(db: Session) -> Dict[str, Any]:
+    """Read dashboard statistics from the rollup table."""
+    rows = db.query(models.LeadStatsRollup).filter(models.LeadStatsRollup.lead_count > 0).all()
+
+    by_dimension: Dict[str, Dict[str, models.LeadStatsRollup]] = defaultdict(dict)
+    for row in rows:
+        by_dimension[row.dimension][row.bucket] = row
+
+    histogram = by_dimension[SCORE_BUCKET]
+    total = sum(row.lead_count for row in histogram.values())
+
+    return {
+        "total_leads": total,
+        "score_histogram": [
+            {"bucket": bucket, "count": histogram[bucket].lead_count if bucket in histogram else 0}
+            for bucket in SCORE_BUCKETS
+        ],
+        "jobs": sorted(
+            (
+                {
+                    "job": row.bucket,
+                    "count": row.lead_count,
+                    "avg_probability": row.probability_sum / row.lead_count,
+                }
+                for row in by_dimension[JOB].values()
+            ),
+            key=lambda item: item["avg_probability"],
+            reverse=True,
+        ),
+        "loan_status": [
+            {"loan_status": row.bucket, "count": row.lead_count}
+            for row in sorted(by_dimension[LOAN_STATUS].values(), key=lambda r: r.bucket)
+        ],
+    }
+
+
+register()
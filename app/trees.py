@@ -0,0 +1,213 @@
+"""
+Lightweight tree-ensemble evaluator
+
+Exports the trees of the trained XGBoost model into flat NumPy arrays
+(``models/model_trees.npz``) and scores them with a vectorized,
+level-by-level traversal. Serving from the export needs only NumPy:
+no xgboost, pandas or scikit-learn import.
+
+Export (requires xgboost/joblib, run once per retrained model)::
+
+    python -m app.trees [model_dir]
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TREES_FILE_NAME = "model_trees.npz"
+
+# Rows scored per traversal chunk; bounds the (rows x trees) index matrix
+_CHUNK_ROWS = 4096
+
+
+def _tree_arrays(booster) -> Dict[str, Any]:
+    """Flatten all trees of an XGBoost booster into global node arrays."""
+    raw = json.loads(booster.save_raw("json"))
+    learner = raw["learner"]
+    objective = learner["objective"]["name"]
+    if objective != "binary:logistic":
+        raise ValueError(f"Unsupported objective for tree export: {objective}")
+
+    trees = learner["gradient_booster"]["model"]["trees"]
+    feature, threshold, left, right, default_left, value = [], [], [], [], [], []
+    roots, max_depth, offset = [], 0, 0
+
+    for tree in trees:
+        if any(tree["split_type"]):
+            raise ValueError("Categorical splits are not supported by the tree evaluator")
+        n_nodes = len(tree["left_children"])
+        roots.append(offset)
+        depth = [0] * n_nodes
+        for node in range(n_nodes):
+            lchild, rchild = tree["left_children"][node], tree["right_children"][node]
+            if lchild == -1:
+                # Leaves point at themselves so extra traversal steps are no-ops
+                feature.append(0)
+                threshold.append(0.0)
+                left.append(offset + node)
+                right.append(offset + node)
+                default_left.append(True)
+                value.append(tree["split_conditions"][node])
+            else:
+                depth[lchild] = depth[rchild] = depth[node] + 1
+                feature.append(tree["split_indices"][node])
+                threshold.append(tree["split_conditions"][node])
+                left.append(offset + lchild)
+                right.append(offset + rchild)
+                default_left.append(bool(tree["default_left"][node]))
+                value.append(0.0)
+        max_depth = max(max_depth, max(depth))
+        offset += n_nodes
+
+    base_score = float(learner["learner_model_param"]["base_score"])
+    return {
+        "feature": np.asarray(feature, dtype=np.int32),
+        "threshold": np.asarray(threshold, dtype=np.float32),
+        "left": np.asarray(left, dtype=np.int32),
+        "right": np.asarray(right, dtype=np.int32),
+        "default_left": np.asarray(default_left, dtype=bool),
+        "value": np.asarray(value, dtype=np.float32),
+        "roots": np.asarray(roots, dtype=np.int32),
+        "max_depth": np.int32(max_depth),
+        "base_margin": np.float32(np.log(base_score / (1.0 - base_score))),
+    }
+
+
+def export_trees(
+    model: Any,
+    model_columns: List[str],
+    path: Union[str, Path],
+    scaler: Optional[Any] = None,
+    threshold_dtype: str = "float32",
+) -> Path:
+    """
+    Write the model's trees, feature columns and scaler parameters to ``path``.
+
+    Args:
+        model: Fitted ``XGBClassifier`` (or raw ``Booster``)
+        model_columns: Feature columns in model order
+        path: Target ``.npz`` file
+        scaler: Optional fitted ``StandardScaler``; stored as mean/scale arrays
+        threshold_dtype: ``"float32"`` (exact) or ``"float16"`` (half the size,
+            splits within float16 rounding of a threshold may flip)
+
+    Returns:
+        Path of the written file
+    """
+    if threshold_dtype not in ("float32", "float16"):
+        raise ValueError(f"Unsupported threshold dtype: {threshold_dtype}")
+
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    arrays = _tree_arrays(booster)
+    arrays["threshold"] = arrays["threshold"].astype(threshold_dtype)
+    arrays["columns"] = np.asarray(model_columns, dtype=str)
+
+    if scaler is not None:
+        arrays["scaler_columns"] = np.asarray(scaler.feature_names_in_, dtype=str)
+        arrays["scaler_mean"] = np.asarray(scaler.mean_, dtype=np.float64)
+        arrays["scaler_scale"] = np.asarray(scaler.scale_, dtype=np.float64)
+
+    path = Path(path)
+    np.savez_compressed(path, **arrays)
+    logger.info(f"Exported {len(arrays['roots'])} trees to {path}")
+    return path
+
+
+class TreeEnsemble:
+    """
+    NumPy evaluator for an exported binary-logistic tree ensemble.
+
+    Mirrors XGBoost's decision rule: go left when ``x < threshold``
+    (compared in float32), follow ``default_left`` for missing values.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"].astype(np.float32)
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.default_left = arrays["default_left"]
+        self.value = arrays["value"].astype(np.float32)
+        self.roots = arrays["roots"]
+        self.max_depth = int(arrays["max_depth"])
+        self.base_margin = float(arrays["base_margin"])
+        self.columns: List[str] = arrays["columns"].tolist()
+
+        self.scaler_columns: Optional[List[str]] = None
+        self.scaler_mean: Optional[np.ndarray] = None
+        self.scaler_scale: Optional[np.ndarray] = None
+        if "scaler_columns" in arrays:
+            self.scaler_columns = arrays["scaler_columns"].tolist()
+            self.scaler_mean = arrays["scaler_mean"]
+            self.scaler_scale = arrays["scaler_scale"]
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "TreeEnsemble":
+        """Load an ensemble written by ``export_trees``."""
+        with np.load(path, allow_pickle=False) as data:
+            return cls({key: data[key] for key in data.files})
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def predict_margin(self, X: np.ndarray) -> np.ndarray:
+        """Raw margin (log-odds) for each row of ``X``."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != len(self.columns):
+            raise ValueError(f"Expected shape (n, {len(self.columns)}), got {X.shape}")
+
+        margins = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], _CHUNK_ROWS):
+            chunk = X[start:start + _CHUNK_ROWS]
+            rows = np.arange(chunk.shape[0])[:, None]
+            # (rows x trees) matrix of current node ids, advanced one level per step
+            nodes = np.broadcast_to(self.roots, (chunk.shape[0], self.n_trees)).copy()
+            for _ in range(self.max_depth):
+                x = chunk[rows, self.feature[nodes]]
+                go_left = np.where(np.isnan(x), self.default_left[nodes], x < self.threshold[nodes])
+                nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+            margins[start:start + _CHUNK_ROWS] = self.value[nodes].sum(axis=1, dtype=np.float64)
+        return margins + self.base_margin
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities, shape ``(n, 2)`` like ``XGBClassifier.predict_proba``."""
+        positive = 1.0 / (1.0 + np.exp(-self.predict_margin(X)))
+        return np.column_stack([1.0 - positive, positive])
+
+    def scale(self, X: np.ndarray) -> np.ndarray:
+        """Apply the exported StandardScaler to its columns of ``X`` (in place)."""
+        if self.scaler_columns is None:
+            return X
+        index = [self.columns.index(col) for col in self.scaler_columns]
+        X[:, index] = (X[:, index] - self.scaler_mean) / self.scaler_scale
+        return X
+
+
+def export_from_model_dir(model_dir: Union[str, Path], threshold_dtype: str = "float32") -> Path:
+    """Export ``model_final_xgb.pkl`` (+ scaler, columns) from ``model_dir``."""
+    import joblib
+
+    model_dir = Path(model_dir)
+    model = joblib.load(model_dir / "model_final_xgb.pkl")
+    model_columns = list(joblib.load(model_dir / "model_columns.pkl"))
+    scaler_path = model_dir / "scaler.pkl"
+    scaler = joblib.load(scaler_path) if scaler_path.exists() else None
+    return export_trees(model, model_columns, model_dir / TREES_FILE_NAME, scaler, threshold_dtype)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Export XGBoost trees for the NumPy evaluator")
+    parser.add_argument("model_dir", nargs="?", default=str(Path(__file__).parent.parent / "models"))
+    parser.add_argument("--float16", action="store_true", help="store thresholds as float16")
+    args = parser.parse_args()
+    export_from_model_dir(args.model_dir, "float16" if args.float16 else "float32")
@@ -1,5 +1,7 @@
 import axios from 'axios';
 
+import authService from './authService';
+
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
 
 const apiClient = axios.create({
@@ -22,4 +24,19 @@ apiClient.interceptors.request.use(
   }
 );
 
+// Token kedaluwarsa (JWT 30 menit) atau token lama di localStorage: logout lalu ke halaman login
+apiClient.interceptors.response.use(
+  (response) => response,
+  (error) => {
+    const isLoginRequest = error.config?.url?.endsWith('/api/auth/login');
+    if (error.response?.status === 401 && !isLoginRequest) {
+      authService.logout();
+      if (window.location.pathname !== '/login') {
+        window.location.assign('/login');
+      }
+    }
+    return Promise.reject(error);
+  }
+);
+
 export default apiClient;
\ No newline at end of file
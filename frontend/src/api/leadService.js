@@ -17,6 +17,17 @@ const leadService = {
     }
   },
 
+  // Statistik dashboard (histogram skor, per job, per loan status) dari backend
+  getLeadStats: async () => {
+    try {
+      const response = await apiClient.get('/leads/stats');
+      return response.data;
+    } catch (error) {
+      console.error('Get Lead Stats API error:', error);
+      throw error;
+    }
+  },
+
   // Mengambil detail lead berdasarkan ID
   getLeadDetail: async (id) => {
     try {
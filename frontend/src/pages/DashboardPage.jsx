@@ -57,15 +57,23 @@ function DashboardPage() {
     setLoading(true);
     setError(null);
     try {
-      const data = await leadService.getLeads({ limit: 1000 });
+      // Kartu statistik dari /leads/stats (tabel rollup), bukan dihitung dari seluruh leads
+      const [data, leadStats] = await Promise.all([
+        leadService.getLeads({}),
+        leadService.getLeadStats(),
+      ]);
       setAllLeads(data);
-      
-      const total = data.length;
-      const high = data.filter(l => l.score >= 80).length;
-      const medium = data.filter(l => l.score >= 50 && l.score < 80).length;
-      const low = data.filter(l => l.score < 50).length;
-      
-      setStats({ total, high, medium, low });
+
+      const countBuckets = (buckets) => leadStats.score_histogram
+        .filter(b => buckets.includes(b.bucket))
+        .reduce((sum, b) => sum + b.count, 0);
+
+      setStats({
+        total: leadStats.total_leads,
+        high: countBuckets(['80-89', '90-100']),
+        medium: countBuckets(['50-59', '60-69', '70-79']),
+        low: countBuckets(['0-9', '10-19', '20-29', '30-39', '40-49']),
+      });
 
     } catch (err) {
       setError("Failed to fetch leads.");
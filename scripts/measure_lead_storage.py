@@ -0,0 +1,89 @@
+import sys
+import os
+import json
+import time
+import logging
+
+# Setup agar script bisa membaca modul 'app' (dari folder mana pun script dijalankan)
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+
+from sqlalchemy import inspect, text
+
+from app import models
+from app.database import SessionLocal, engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def list_query_sql(conn) -> str:
+    """SQL yang dijalankan GET /leads untuk schema saat ini."""
+    columns = {c["name"] for c in inspect(conn).get_columns("leads")}
+    if "key_information" in columns:
+        # Sebelum migrasi 0004 model ORM memuat semua kolom JSON
+        return "SELECT * FROM leads"
+    db = SessionLocal(bind=conn)
+    statement = db.query(models.Lead).statement
+    return str(statement.compile(dialect=conn.dialect))
+
+
+def table_size(conn, table: str) -> dict:
+    if conn.dialect.name == "postgresql":
+        row = conn.execute(text(
+            "SELECT pg_relation_size(oid) AS heap_bytes, "
+            "COALESCE(pg_total_relation_size(NULLIF(reltoastrelid, 0)), 0) AS toast_bytes, "
+            "pg_total_relation_size(oid) AS total_bytes "
+            "FROM pg_class WHERE oid = CAST(:table AS regclass)"
+        ), {"table": table}).mappings().one()
+        return dict(row)
+    # SQLite: halaman b-tree tabel + overflow (butuh dbstat)
+    row = conn.execute(text(
+        "SELECT COUNT(*) AS pages, SUM(pgsize) AS total_bytes FROM dbstat WHERE name = :table"
+    ), {"table": table}).mappings().one()
+    return dict(row)
+
+
+def _read_bytes() -> int:
+    # Byte yang dibaca proses lewat read()/pread() (Linux)
+    try:
+        with open("/proc/self/io") as f:
+            return int(next(line for line in f if line.startswith("rchar:")).split()[1])
+    except (OSError, StopIteration):
+        return 0
+
+
+def list_query_io(conn, sql: str) -> dict:
+    if conn.dialect.name == "postgresql":
+        plan = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        top = plan[0]["Plan"]
+        block_size = int(conn.execute(text("SHOW block_size")).scalar())
+        blocks = top.get("Shared Hit Blocks", 0) + top.get("Shared Read Blocks", 0)
+        return {"buffers": blocks, "bytes": blocks * block_size, "ms": plan[0]["Execution Time"]}
+
+    # SQLite: koneksi baru = page cache kosong, jadi semua halaman dibaca dari file
+    with engine.connect() as fresh:
+        before = _read_bytes()
+        started = time.perf_counter()
+        rows = fresh.execute(text(sql)).fetchall()
+        elapsed = (time.perf_counter() - started) * 1000
+        return {"rows": len(rows), "bytes": _read_bytes() - before, "ms": round(elapsed, 2)}
+
+
+if __name__ == "__main__":
+    # Jalankan sebelum dan sesudah `python -m app.migrations` untuk membandingkan
+    with engine.connect() as conn:
+        sql = list_query_sql(conn)
+        report = {
+            "dialect": conn.dialect.name,
+            "leads": conn.execute(text("SELECT COUNT(*) FROM leads")).scalar(),
+            "tables": {
+                table: table_size(conn, table)
+                for table in ("leads", "lead_profiles") if inspect(conn).has_table(table)
+            },
+            "list_query": list_query_io(conn, sql),
+        }
+    logger.info(f"List query: {sql}")
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,22 @@
+import sys
+import os
+import logging
+
+# Setup agar script bisa membaca modul 'app' (dari folder mana pun script dijalankan)
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+
+from app.database import SessionLocal
+from app.stats import rebuild_lead_stats
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+if __name__ == "__main__":
+    # Hitung ulang tabel rollup dari seluruh leads (data lama sudah diisi migrasi 0006; ini untuk perbaikan)
+    db = SessionLocal()
+    try:
+        total = rebuild_lead_stats(db)
+        logger.info(f"✅ Rollup statistik dibangun ulang dari {total} leads.")
+    finally:
+        db.close()
@@ -0,0 +1,38 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Tests run against a throwaway SQLite database unless DATABASE_URL is set
+os.environ.setdefault(
+    "DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+)
+
+# Point the model loader at an empty directory so /predict runs in dummy mode
+os.environ.setdefault("MODEL_DIR", tempfile.mkdtemp())
+
+# Startup refuses the public default signing key
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+# Uploaded job files and results
+os.environ.setdefault("JOB_DIR", tempfile.mkdtemp())
+
+# Schema is migration-managed; bring the test database up to date once
+from app.migrations import migrate  # noqa: E402
+
+migrate()
+
+
+@pytest.fixture(scope="session")
+def auth_client():
+    """TestClient logged in as the demo user (Bearer token on every request)."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    client = TestClient(app)
+    r = client.post("/api/auth/login", json={"username": "sales_user_01", "password": "password123"})
+    client.headers["Authorization"] = f"Bearer {r.json()['token']}"
+    return client
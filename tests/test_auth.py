@@ -0,0 +1,71 @@
+import sys
+import os
+import subprocess
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from datetime import timedelta
+from fastapi.testclient import TestClient
+from app.main import app
+from app import auth
+
+client = TestClient(app)
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _login(password="password123"):
+    return client.post("/api/auth/login", json={"username": "sales_user_01", "password": password})
+
+
+def test_login_returns_verifiable_jwt():
+    r = _login()
+    assert r.status_code == 200
+    body = r.json()
+    assert body["token"] != "dummy-jwt-token"
+    assert body["user"] == {"name": "Sales User", "username": "sales_user_01"}
+    assert auth.verify_token(body["token"])["username"] == "sales_user_01"
+
+
+def test_login_rejects_wrong_password():
+    assert _login("wrong").status_code == 401
+
+
+def test_protected_endpoint_requires_token():
+    assert client.get("/leads").status_code == 401
+    bad = client.get("/leads", headers={"Authorization": "Bearer not-a-jwt"})
+    assert bad.status_code == 401
+
+    token = _login().json()["token"]
+    ok = client.get("/leads", headers={"Authorization": f"Bearer {token}"})
+    assert ok.status_code == 200
+
+
+def test_token_cache_is_used_and_bounded():
+    auth.token_cache.clear()
+    token = auth.create_access_token({"sub": "sales_user_01"})
+    user = auth.verify_token(token)
+    assert auth.token_cache.get(token) is user
+
+    cache = auth.TokenCache(maxsize=2, ttl=60)
+    for name in ("a", "b", "c"):
+        cache.put(name, {"username": name})
+    assert len(cache) == 2
+    assert cache.get("a") is None
+
+    expired = auth.TokenCache(maxsize=2, ttl=60)
+    expired.put("old", {"username": "x"}, token_exp=0)
+    assert expired.get("old") is None
+
+
+def test_expired_token_rejected():
+    token = auth.create_access_token({"sub": "sales_user_01"}, expires_delta=timedelta(seconds=-1))
+    r = client.get("/leads", headers={"Authorization": f"Bearer {token}"})
+    assert r.status_code == 401
+
+
+def test_empty_demo_password_hash_uses_default():
+    # `DEMO_PASSWORD_HASH=` copied from .env.example must not break login
+    code = "from app.config import settings; print(settings.demo_password_hash)"
+    env = dict(os.environ, DEMO_PASSWORD_HASH="")
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip().startswith("$2b$")
@@ -0,0 +1,99 @@
+import sys
+import os
+import asyncio
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.database import SessionLocal
+from app import changes, models
+
+
+def _latest_cursor(auth_client):
+    cursor = 0
+    while True:
+        page = auth_client.get("/leads/changes", params={"since": cursor, "limit": 5000}).json()
+        cursor = page["next_cursor"]
+        if not page["has_more"]:
+            return cursor
+
+
+def test_create_and_rescore_emit_events(auth_client):
+    cursor = _latest_cursor(auth_client)
+    db = SessionLocal()
+    try:
+        db.add(models.Lead(id="CDC-1", customer_name="CDC", probability_score=0.2, score=20))
+        db.commit()
+
+        lead = db.get(models.Lead, "CDC-1")
+        lead.customer_name = "CDC renamed"  # not a score change
+        db.commit()
+
+        lead = db.get(models.Lead, "CDC-1")
+        lead.probability_score = 0.9
+        lead.score = 90
+        db.commit()
+
+        page = auth_client.get("/leads/changes", params={"since": cursor}).json()
+        events = [e for e in page["events"] if e["lead_id"] == "CDC-1"]
+        assert [e["event"] for e in events] == ["created", "rescored"]
+        assert events[1]["score"] == 90
+        assert events[1]["previous_score"] == 20
+        assert events[0]["cursor"] < events[1]["cursor"]
+        assert page["next_cursor"] == events[-1]["cursor"]
+
+        # Nothing new after the returned cursor
+        again = auth_client.get("/leads/changes", params={"since": page["next_cursor"]}).json()
+        assert again["events"] == []
+        assert again["next_cursor"] == page["next_cursor"]
+    finally:
+        db.query(models.Lead).filter(models.Lead.id == "CDC-1").delete()
+        db.commit()
+        db.close()
+
+
+def test_changes_paging(auth_client):
+    cursor = _latest_cursor(auth_client)
+    db = SessionLocal()
+    try:
+        db.add_all([
+            models.Lead(id=f"CDC-P{i}", customer_name="P", probability_score=0.5, score=50)
+            for i in range(3)
+        ])
+        db.commit()
+
+        first = auth_client.get("/leads/changes", params={"since": cursor, "limit": 2}).json()
+        assert len(first["events"]) == 2
+        assert first["has_more"] is True
+        second = auth_client.get("/leads/changes", params={"since": first["next_cursor"], "limit": 2}).json()
+        assert len(second["events"]) == 1
+        assert second["has_more"] is False
+    finally:
+        db.query(models.Lead).filter(models.Lead.id.like("CDC-P%")).delete()
+        db.commit()
+        db.close()
+
+
+def test_stream_yields_sse_events(auth_client):
+    cursor = _latest_cursor(auth_client)
+    db = SessionLocal()
+    try:
+        db.add(models.Lead(id="CDC-S", customer_name="S", probability_score=0.4, score=40))
+        db.commit()
+    finally:
+        db.close()
+
+    async def first_event():
+        stream = changes.stream_changes(cursor, poll_seconds=0.01)
+        try:
+            return await stream.__anext__()
+        finally:
+            await stream.aclose()
+
+    try:
+        message = asyncio.run(first_event())
+        assert message.startswith("id: ")
+        assert "event: created" in message
+        assert '"lead_id": "CDC-S"' in message
+    finally:
+        db = SessionLocal()
+        db.query(models.Lead).filter(models.Lead.id == "CDC-S").delete()
+        db.commit()
+        db.close()
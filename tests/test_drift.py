@@ -0,0 +1,127 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from app import main
+from app.drift import DriftMonitor, REFERENCE_FILE_NAME, build_reference, model_space, to_prometheus
+from app.inference import ModelService
+
+client = TestClient(main.app)
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+MODEL_DIR = os.path.join(PROJECT_ROOT, "models")
+BANK_CSV = os.path.join(PROJECT_ROOT, "ml", "dataset", "bank.csv")
+
+
+@pytest.fixture(scope="module")
+def tree_service():
+    return ModelService(MODEL_DIR, engine="trees")
+
+
+def _bank_rows(columns):
+    pd = pytest.importorskip("pandas")
+    df, _ = model_space(pd.read_csv(BANK_CSV, sep=";"), columns)
+    return df.to_numpy(dtype=np.float64)
+
+
+def test_reference_traffic_has_no_drift(tree_service):
+    columns = tree_service.model_columns
+    monitor = DriftMonitor(build_reference(BANK_CSV, columns), columns, batch_size=64)
+    for row in _bank_rows(columns):
+        monitor.observe(row[None, :])
+
+    report = monitor.report()
+    assert report["observed_rows"] == report["reference_rows"]
+    assert report["max_psi"] < 1e-6
+    assert report["max_ks"] < 1e-9
+    assert report["columns"]["job_student"]["type"] == "onehot"
+    assert report["columns"]["age"]["type"] == "numeric"
+
+
+def test_shifted_feature_is_flagged(tree_service):
+    columns = tree_service.model_columns
+    monitor = DriftMonitor.load(os.path.join(MODEL_DIR, REFERENCE_FILE_NAME), columns)
+    rows = _bank_rows(columns)
+    rows[:, columns.index("age")] += 25
+    monitor.observe(rows)
+
+    report = monitor.report()
+    assert report["columns"]["age"]["psi"] > 0.25
+    assert report["columns"]["campaign"]["psi"] < 1e-6
+
+
+def test_predictions_feed_monitor_and_metrics(monkeypatch, tree_service):
+    tree_service.drift_monitor = DriftMonitor.load(
+        os.path.join(MODEL_DIR, REFERENCE_FILE_NAME), tree_service.model_columns, batch_size=4
+    )
+    monkeypatch.setattr(main, "_model_service", tree_service)
+    try:
+        for age in (25, 35, 45):
+            assert client.post("/predict", json={"features": {"age": age}}).status_code == 200
+
+        body = client.get("/metrics/drift").json()
+        assert body["enabled"] is True
+        assert body["observed_rows"] == 3
+
+        text = client.get("/metrics/drift", params={"format": "prometheus"}).text
+        assert "lead_scoring_drift_observed_rows 3" in text
+        assert 'lead_scoring_drift_psi{feature="age"}' in text
+    finally:
+        tree_service.drift_monitor = None
+
+
+def test_columns_missing_from_bank_csv_are_not_monitored(tree_service):
+    columns = tree_service.model_columns
+    monitor = DriftMonitor.load(os.path.join(MODEL_DIR, REFERENCE_FILE_NAME), columns)
+    # Valid bank-additional values that bank.csv has no data for
+    row = np.zeros((1, len(columns)))
+    for col, value in (("nr.employed", 5191.0), ("euribor3m", 4.8), ("day_of_week_mon", 1.0),
+                       ("education_university.degree", 1.0), ("poutcome_nonexistent", 1.0)):
+        row[0, columns.index(col)] = value
+    monitor.observe(np.repeat(row, 50, axis=0))
+    monitor.observe(_bank_rows(columns))
+
+    report = monitor.report()
+    for col in ("nr.employed", "euribor3m", "day_of_week_mon", "education_university.degree",
+                "poutcome_nonexistent"):
+        assert report["columns"][col] == {"type": "no_reference"}
+    assert report["columns"]["pernah_dihubungi"]["type"] == "numeric"
+    assert report["max_psi"] < 0.1
+    assert "nr.employed" not in to_prometheus(report)
+
+
+def test_warmup_is_not_observed(tree_service):
+    tree_service.drift_monitor = DriftMonitor.load(
+        os.path.join(MODEL_DIR, REFERENCE_FILE_NAME), tree_service.model_columns
+    )
+    try:
+        tree_service.warmup()
+        assert tree_service.drift_monitor.report()["observed_rows"] == 0
+    finally:
+        tree_service.drift_monitor = None
+
+
+def test_drift_disabled_without_reference():
+    assert client.get("/metrics/drift").json() == {"enabled": False}
+
+
+def test_omitted_features_do_not_raise_psi(monkeypatch, tree_service):
+    tree_service.drift_monitor = DriftMonitor.load(
+        os.path.join(MODEL_DIR, REFERENCE_FILE_NAME), tree_service.model_columns, batch_size=4
+    )
+    monkeypatch.setattr(main, "_model_service", tree_service)
+    try:
+        for age in range(25, 65):
+            assert client.post("/predict", json={"features": {"age": age}}).status_code == 200
+
+        report = client.get("/metrics/drift").json()
+        assert report["observed_rows"] == 40
+        assert report["columns"]["age"]["observed"] == 40
+        for col in ("campaign", "pernah_dihubungi", "previous"):
+            assert report["columns"][col] == {"type": "numeric", "observed": 0}
+        scored = [c for c in report["columns"].values() if c["type"] == "numeric" and "psi" in c]
+        assert scored == [report["columns"]["age"]]
+    finally:
+        tree_service.drift_monitor = None
@@ -0,0 +1,171 @@
+import sys
+import os
+import io
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.config import settings
+from app.database import SessionLocal
+from app import jobs, main, models
+from app.inference import ModelService
+
+BANK_CSV = os.path.join(os.path.dirname(__file__), '..', 'ml', 'dataset', 'bank.csv')
+MODEL_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
+
+
+def _sample_csv(rows):
+    with open(BANK_CSV, "rb") as f:
+        return b"".join(f.readline() for _ in range(rows + 1))
+
+
+def _drain_queue():
+    while jobs.process_next_job("test-worker") is not None:
+        pass
+
+
+def test_score_job_reports_progress_and_result(auth_client, monkeypatch):
+    monkeypatch.setattr(settings, "job_chunk_rows", 7)
+    _drain_queue()
+
+    r = auth_client.post("/jobs/score", files={"file": ("leads.csv", _sample_csv(20), "text/csv")})
+    assert r.status_code == 202
+    job_id = r.json()["id"]
+    assert r.json()["status"] == "queued"
+    assert auth_client.get(f"/jobs/{job_id}/result").status_code == 409
+
+    assert jobs.process_next_job("test-worker") == job_id
+
+    body = auth_client.get(f"/jobs/{job_id}").json()
+    assert body["status"] == "done"
+    assert body["total_rows"] == 20
+    assert body["processed_rows"] == 20
+    assert body["percent_complete"] == 100.0
+    assert body["error_count"] == 0
+    assert body["rows_per_sec"] is not None
+
+    result = auth_client.get(f"/jobs/{job_id}/result")
+    assert result.status_code == 200
+    lines = result.text.strip().splitlines()
+    assert len(lines) == 21
+    assert lines[0].endswith("probability,score")
+
+
+def test_import_job_creates_leads(auth_client):
+    _drain_queue()
+    r = auth_client.post("/jobs/import", files={"file": ("leads.csv", _sample_csv(5), "text/csv")})
+    job_id = r.json()["id"]
+    jobs.process_next_job("test-worker")
+
+    body = auth_client.get(f"/jobs/{job_id}").json()
+    assert body["status"] == "done"
+    assert body["processed_rows"] == 5
+
+    db = SessionLocal()
+    try:
+        leads = db.query(models.Lead).filter(models.Lead.id.like(f"JOB{job_id}-%")).all()
+        assert len(leads) == 5
+        for lead in leads:
+            db.delete(lead)
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_job_is_claimed_once():
+    _drain_queue()
+    db = SessionLocal()
+    try:
+        job = jobs.enqueue_job(db, "score", io.BytesIO(_sample_csv(1)), "one.csv")
+        claimed = jobs.claim_next_job(db, "worker-a")
+        assert claimed.id == job.id
+        assert claimed.status == "running"
+        assert jobs.claim_next_job(db, "worker-b") is None
+    finally:
+        db.close()
+
+
+def test_unknown_job_returns_404(auth_client):
+    assert auth_client.get("/jobs/999999").status_code == 404
+
+
+def test_job_of_dead_worker_is_reclaimed_and_resumed(monkeypatch):
+    monkeypatch.setattr(settings, "job_chunk_rows", 2)
+    monkeypatch.setattr(settings, "job_lease_seconds", 0)
+    _drain_queue()  # includes jobs left running by earlier tests
+    monkeypatch.setattr(settings, "job_lease_seconds", 300)
+
+    real_import = jobs._PROCESSORS["import"]
+    calls = []
+
+    def crash_on_second_chunk(job, chunk, db):
+        calls.append(len(chunk))
+        if len(calls) == 2:
+            raise KeyboardInterrupt  # escapes run_job like a killed process
+        return real_import(job, chunk, db)
+
+    db = SessionLocal()
+    try:
+        job = jobs.enqueue_job(db, "import", io.BytesIO(_sample_csv(5)), "crash.csv")
+        monkeypatch.setitem(jobs._PROCESSORS, "import", crash_on_second_chunk)
+        claimed = jobs.claim_next_job(db, "dead-worker")
+        try:
+            jobs.run_job(db, claimed)
+        except KeyboardInterrupt:
+            db.rollback()
+        monkeypatch.setitem(jobs._PROCESSORS, "import", real_import)
+
+        # Lease still valid: nobody else may take it
+        assert jobs.claim_next_job(db, "worker-b") is None
+
+        monkeypatch.setattr(settings, "job_lease_seconds", 0)
+        reclaimed = jobs.claim_next_job(db, "worker-b")
+        assert reclaimed.id == job.id and reclaimed.processed_rows == 2
+        jobs.run_job(db, reclaimed)
+
+        assert reclaimed.status == "done"
+        assert reclaimed.processed_rows == 5
+        assert reclaimed.error_count == 0
+        leads = db.query(models.Lead).filter(models.Lead.id.like(f"JOB{job.id}-%")).all()
+        assert sorted(lead.id for lead in leads) == [f"JOB{job.id}-{i}" for i in range(5)]
+        for lead in leads:
+            db.delete(lead)
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_worker_stops_when_its_lease_was_taken(monkeypatch):
+    monkeypatch.setattr(settings, "job_lease_seconds", 0)
+    _drain_queue()
+    db = SessionLocal()
+    other = SessionLocal()
+    try:
+        jobs.enqueue_job(db, "score", io.BytesIO(_sample_csv(1)), "one.csv")
+        job = jobs.claim_next_job(db, "worker-a")
+        assert jobs.claim_next_job(other, "worker-b").id == job.id
+        with pytest.raises(jobs.LeaseLostError):
+            jobs._heartbeat(db, job)
+        db.rollback()
+        jobs.run_job(other, other.get(models.Job, job.id))
+    finally:
+        db.close()
+        other.close()
+
+
+def test_lead_form_score_job_and_predict_batch_agree(auth_client, monkeypatch):
+    pd = pytest.importorskip("pandas")
+    service = ModelService(MODEL_DIR, engine="trees")
+    monkeypatch.setattr(jobs, "_model_service", service)
+    monkeypatch.setattr(main, "_model_service", service)
+    _drain_queue()
+
+    r = auth_client.post("/jobs/score", files={"file": ("leads.csv", _sample_csv(5), "text/csv")})
+    jobs.process_next_job("test-worker")
+    result = pd.read_csv(io.StringIO(auth_client.get(f"/jobs/{r.json()['id']}/result").text))
+
+    raw = pd.read_csv(BANK_CSV, sep=";", nrows=5)
+    batch = service.predict_batch(raw)
+    for (_, row), job_probability, batch_probability in zip(raw.iterrows(), result["probability"], batch):
+        lead = {k: (v.item() if hasattr(v, "item") else v) for k, v in row.items() if k != "y"}
+        online = auth_client.post("/predict", json={"lead": lead}).json()["probability"]
+        assert abs(online - job_probability) < 1e-6
+        assert abs(online - batch_probability) < 1e-12
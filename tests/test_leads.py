@@ -0,0 +1,82 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from sqlalchemy import event
+from app.database import SessionLocal, engine
+from app.importer import lead_from_row
+from app import models
+
+ROW = {
+    "age": 30, "job": "unemployed", "marital": "married", "education": "primary",
+    "default": "no", "balance": 1787, "housing": "no", "loan": "no",
+    "contact": "cellular", "day": 19, "month": "oct", "duration": 79,
+    "campaign": 1, "pdays": -1, "previous": 0, "poutcome": "unknown",
+}
+
+
+def _seed():
+    db = SessionLocal()
+    try:
+        if db.get(models.Lead, "LP-1") is None:
+            db.add(lead_from_row(ROW, 0, "LP-1", 0.61))
+            db.commit()
+    finally:
+        db.close()
+
+
+def _statements(auth_client, path):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        r = auth_client.get(path)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert r.status_code == 200
+    return r.json(), statements
+
+
+def test_list_query_never_reads_profiles(auth_client):
+    _seed()
+    body, statements = _statements(auth_client, "/leads")
+    assert any(lead["id"] == "LP-1" for lead in body)
+    assert not any("lead_profiles" in s for s in statements)
+
+
+def test_detail_loads_profile_in_one_query(auth_client):
+    _seed()
+    body, statements = _statements(auth_client, "/leads/LP-1")
+    assert len([s for s in statements if "lead_profiles" in s]) == 1
+    assert body["key_information"] == {
+        "customer_id": "LP-1", "customer_name": "Nasabah-001",
+        "probability_score": 61, "status_target": "yes",
+    }
+    assert body["demographic_profile"]["age"] == 30
+    assert body["financial_profile"]["average_balance"] == 1787
+    assert body["campaign_history"]["duration_seconds"] == 79
+
+
+def test_deleting_a_lead_removes_its_profile():
+    db = SessionLocal()
+    try:
+        db.add(lead_from_row(ROW, 1, "LP-DEL", 0.3))
+        db.commit()
+        db.delete(db.get(models.Lead, "LP-DEL"))
+        db.commit()
+        assert db.get(models.LeadProfile, "LP-DEL") is None
+
+        # Bulk deletes skip the ORM cascade; the foreign key handles those
+        db.add(lead_from_row(ROW, 1, "LP-DEL", 0.3))
+        db.commit()
+        db.query(models.Lead).filter(models.Lead.id == "LP-DEL").delete()
+        db.commit()
+        db.add(lead_from_row(ROW, 1, "LP-DEL", 0.4))
+        db.commit()
+        assert db.get(models.Lead, "LP-DEL").profile["demographic"]["age"] == 30
+    finally:
+        db.query(models.Lead).filter(models.Lead.id == "LP-DEL").delete()
+        db.commit()
+        db.close()
@@ -0,0 +1,87 @@
+import sys
+import os
+import json
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect, text
+from app import main, migrations, stats
+from app.database import SessionLocal
+from app.config import settings
+
+
+def _fresh_engine():
+    return create_engine("sqlite:///" + os.path.join(tempfile.mkdtemp(), "migrate.db"))
+
+
+def test_check_schema_fails_before_migrate():
+    engine = _fresh_engine()
+    with pytest.raises(migrations.SchemaOutdatedError):
+        migrations.check_schema(engine)
+
+
+def test_migrate_is_idempotent_and_creates_tables():
+    engine = _fresh_engine()
+    assert migrations.migrate(engine) == migrations.SCHEMA_VERSION
+    assert migrations.migrate(engine) == migrations.SCHEMA_VERSION
+    assert migrations.check_schema(engine) == migrations.SCHEMA_VERSION
+    tables = set(inspect(engine).get_table_names())
+    assert {"leads", "notes", "lead_stats_rollup", "schema_version"} <= tables
+
+
+def test_startup_warmup(monkeypatch):
+    monkeypatch.setattr(settings, "warmup", True)
+    monkeypatch.setattr(settings, "warmup_connections", 2)
+    with TestClient(main.app) as client:
+        assert client.get("/health").status_code == 200
+    assert "warmup" in main.startup_profile.phases
+
+
+def test_0004_moves_profiles_out_of_leads():
+    engine = _fresh_engine()
+    assert migrations.migrate(engine, target=3) == 3
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO leads (id, customer_name, score, key_information, demographic_profile, "
+            "financial_profile, campaign_history) VALUES ('M-1', 'M', 70, '{\"customer_id\": \"M-1\"}', "
+            "'{\"age\": 30}', '{\"average_balance\": 5}', '{\"duration_seconds\": 9}')"
+        ))
+        conn.execute(text("INSERT INTO leads (id, customer_name, score) VALUES ('M-2', 'N', 10)"))
+
+    assert migrations.migrate(engine) == migrations.SCHEMA_VERSION
+    columns = {c["name"] for c in inspect(engine).get_columns("leads")}
+    assert "key_information" not in columns
+    assert not columns & set(migrations._OLD_PROFILE_COLUMNS)
+
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT lead_id, profile FROM lead_profiles")).all()
+    assert [row.lead_id for row in rows] == ["M-1"]
+    assert json.loads(rows[0].profile) == {
+        "demographic": {"age": 30},
+        "financial": {"average_balance": 5},
+        "campaign": {"duration_seconds": 9},
+    }
+
+
+def test_0006_backfills_lead_stats_rollup():
+    engine = _fresh_engine()
+    assert migrations.migrate(engine, target=5) == 5
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO leads (id, customer_name, probability_score, score, job, loan_status) VALUES "
+            "('S-1', 'A', 0.8, 80, 'admin.', 'Has Loan'), ('S-2', 'B', 0.25, 25, 'admin.', 'No Loan')"
+        ))
+
+    assert migrations.migrate(engine) == migrations.SCHEMA_VERSION
+    db = SessionLocal(bind=engine)
+    try:
+        body = stats.get_lead_stats(db)
+    finally:
+        db.close()
+    assert body["total_leads"] == 2
+    assert {b["bucket"]: b["count"] for b in body["score_histogram"]}["80-89"] == 1
+    assert body["jobs"] == [{"job": "admin.", "count": 2, "avg_probability": pytest.approx(0.525)}]
+    assert body["loan_status"] == [
+        {"loan_status": "Has Loan", "count": 1}, {"loan_status": "No Loan", "count": 1},
+    ]
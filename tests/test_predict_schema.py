@@ -0,0 +1,99 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from fastapi.testclient import TestClient
+from app import main
+from app.main import app
+from app.inference import ModelService
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+MODEL_DIR = os.path.join(PROJECT_ROOT, "models")
+
+client = TestClient(app)
+
+LEAD = {
+    "age": 30, "job": "unemployed", "marital": "married", "education": "primary",
+    "default": "no", "balance": 1787, "housing": "no", "loan": "no",
+    "contact": "cellular", "day": 19, "month": "oct", "duration": 79,
+    "campaign": 1, "pdays": -1, "previous": 0, "poutcome": "unknown",
+}
+
+
+@pytest.fixture
+def trees_service(monkeypatch):
+    service = ModelService(MODEL_DIR, engine="trees")
+    monkeypatch.setattr(main, "_model_service", service)
+    return service
+
+
+def test_lead_form_reports_unknown_and_missing(trees_service):
+    r = client.post("/predict", json={"lead": LEAD})
+    assert r.status_code == 200
+    j = r.json()
+    assert 0.0 <= j["probability"] <= 1.0
+    # bank.csv-only levels and columns the model never saw
+    assert "education=primary" in j["unknown_features"]
+    assert "poutcome=unknown" in j["unknown_features"]
+    assert "balance" in j["unknown_features"]
+    # bank-additional columns the model uses but bank.csv lacks
+    assert "day_of_week" in j["missing_features"]
+    assert "nr.employed" in j["missing_features"]
+    assert "pernah_dihubungi" not in j["missing_features"]
+
+
+def test_lead_form_matches_encoded_features(trees_service):
+    lead = dict(LEAD, education="university.degree", poutcome="success", pdays=3,
+                day_of_week="mon", **{"emp.var.rate": 1.1, "cons.price.idx": 93.9,
+                                      "cons.conf.idx": -36.4, "euribor3m": 4.8,
+                                      "nr.employed": 5191})
+    for key in ("balance", "day", "duration"):
+        lead.pop(key)
+    j = client.post("/predict", json={"lead": lead}).json()
+    assert j["unknown_features"] == [] and j["missing_features"] == []
+
+    features = {
+        "age": 30, "campaign": 1, "previous": 0, "pernah_dihubungi": 1,
+        "emp.var.rate": 1.1, "cons.price.idx": 93.9, "cons.conf.idx": -36.4,
+        "euribor3m": 4.8, "nr.employed": 5191, "job_unemployed": 1, "marital_married": 1,
+        "education_university.degree": 1, "month_oct": 1, "day_of_week_mon": 1,
+        "poutcome_success": 1,
+    }
+    assert j["probability"] == client.post("/predict", json={"features": features}).json()["probability"]
+
+
+def test_lead_form_rejects_bad_values(trees_service):
+    assert client.post("/predict", json={"lead": dict(LEAD, job="astronaut")}).status_code == 422
+    assert client.post("/predict", json={"lead": dict(LEAD, extra=1)}).status_code == 422
+    lead = dict(LEAD)
+    lead.pop("age")
+    assert client.post("/predict", json={"lead": lead}).status_code == 422
+
+
+def test_values_form_uses_metadata_order(trees_service):
+    columns = client.get("/metadata").json()["features"]
+    features = {"age": 45, "campaign": 3, "nr.employed": 5099, "euribor3m": 1.3, "job_retired": 1}
+    values = [float(features.get(col, 0)) for col in columns]
+
+    by_name = client.post("/predict", json={"features": features}).json()
+    by_value = client.post("/predict", json={"values": values}).json()
+    assert by_value["probability"] == by_name["probability"]
+
+    r = client.post("/predict", json={"values": values[:-1]})
+    assert r.status_code == 422
+    assert str(len(columns)) in r.json()["detail"]
+
+
+def test_features_form_errors_are_not_masked(trees_service):
+    r = client.post("/predict", json={"features": {"age": "forty"}})
+    assert r.status_code == 422
+    assert "age" in r.json()["detail"]
+
+    j = client.post("/predict", json={"features": {"age": 40, "favourite_color": 3}}).json()
+    assert j["unknown_features"] == ["favourite_color"]
+    assert "campaign" in j["missing_features"]
+
+
+def test_exactly_one_form_required():
+    assert client.post("/predict", json={}).status_code == 422
+    assert client.post("/predict", json={"features": {"age": 1}, "values": [1.0]}).status_code == 422
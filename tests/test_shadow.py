@@ -0,0 +1,67 @@
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import tempfile
+from app.config import settings
+from app import shadow
+
+
+def _wait_idle(evaluator, timeout=10.0):
+    deadline = time.time() + timeout
+    while evaluator._pending and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_shadow_disabled_by_default(auth_client):
+    assert auth_client.get("/admin/shadow").json() == {"enabled": False}
+
+
+def test_predict_is_shadowed(auth_client, monkeypatch):
+    # Candidate with no artifacts -> dummy predictions, enough to check the plumbing
+    evaluator = shadow.ShadowEvaluator(tempfile.mkdtemp(), buffer_size=4)
+    monkeypatch.setattr(settings, "shadow_model_dir", evaluator.model_dir)
+    monkeypatch.setattr(shadow, "_shadow", evaluator)
+    try:
+        for age in (20, 30, 40, 50, 60):
+            r = auth_client.post("/predict", json={"features": {"age": age, "balance": 100.0}})
+            assert r.status_code == 200
+        _wait_idle(evaluator)
+
+        summary = auth_client.get("/admin/shadow").json()
+        assert summary["enabled"] is True
+        assert summary["submitted_batches"] == 5
+        # Ring buffer keeps only the newest rows
+        assert summary["samples"] == 4
+        assert summary["abs_delta"]["max"] < 1e-6
+        assert summary["agreement"] == 1.0
+        assert summary["shadow_latency_ms"]["p50"] is not None
+    finally:
+        evaluator.shutdown()
+
+
+def test_pending_cap_drops_batches():
+    evaluator = shadow.ShadowEvaluator(tempfile.mkdtemp(), max_pending=0)
+    try:
+        assert evaluator.submit({"age": 1}, 0.5, 1.0) is False
+        assert evaluator.dropped == 1
+        assert evaluator.submitted == 0
+    finally:
+        evaluator.shutdown()
+
+
+def test_candidate_errors_count_as_failures():
+    model_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'models'))
+    evaluator = shadow.ShadowEvaluator(model_dir, engine="trees")
+    try:
+        evaluator.submit({"age": 40, "campaign": 2}, 0.3, 1.0)
+        evaluator.submit({"age": "forty"}, 0.3, 1.0)
+        _wait_idle(evaluator)
+
+        summary = evaluator.summary()
+        assert summary["failed_batches"] == 1
+        assert summary["samples"] == 1
+        expected = evaluator.candidate.score(features={"age": 40, "campaign": 2})["probability"]
+        assert abs(summary["delta"]["mean"] - (expected - 0.3)) < 1e-6
+    finally:
+        evaluator.shutdown()
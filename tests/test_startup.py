@@ -0,0 +1,68 @@
+import sys
+import os
+import subprocess
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.config import DEFAULT_SECRET_KEY, InsecureSecretKeyError, settings
+from app import startup
+
+client = TestClient(app)
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Cold-start budget for `import app.main`; override on slow CI machines
+IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1500"))
+
+
+def test_heavy_modules_not_imported_at_startup():
+    code = "import sys, app.main; print(','.join(m for m in ('pandas', 'xgboost') if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == ""
+
+
+def test_import_time_within_budget():
+    breakdown = startup.import_breakdown("app.main")
+    assert breakdown["cumulative_ms"] is not None
+    assert breakdown["cumulative_ms"] < IMPORT_BUDGET_MS, breakdown["slowest"]
+
+
+def test_parse_importtime():
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       100 |        100 |   app.config\n"
+        "import time:       200 |        300 | app.main\n"
+    )
+    entries = startup.parse_importtime(output)
+    assert entries == [
+        {"module": "app.config", "self_us": 100, "cumulative_us": 100, "depth": 1},
+        {"module": "app.main", "self_us": 200, "cumulative_us": 300, "depth": 0},
+    ]
+
+
+def test_debug_startup_endpoint(monkeypatch):
+    monkeypatch.setattr(settings, "startup_profile", False)
+    monkeypatch.setattr(settings, "debug", False)
+    assert client.get("/debug/startup").status_code == 404
+
+    monkeypatch.setattr(settings, "startup_profile", True)
+    with TestClient(app) as started:
+        r = started.get("/debug/startup")
+    assert r.status_code == 200
+    phases = r.json()["phases_ms"]
+    assert "import" in phases
+    assert "schema_check" in phases
+
+
+def test_refuses_default_secret_key_unless_debug(monkeypatch):
+    monkeypatch.setattr(settings, "secret_key", DEFAULT_SECRET_KEY)
+    monkeypatch.setattr(settings, "debug", False)
+    with pytest.raises(InsecureSecretKeyError):
+        with TestClient(app):
+            pass
+
+    monkeypatch.setattr(settings, "debug", True)
+    settings.check_secret_key()
@@ -0,0 +1,102 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from sqlalchemy.exc import IntegrityError
+from app.database import SessionLocal
+from app import models, stats
+
+
+def _make_lead(lead_id, score, job, loan_status):
+    return models.Lead(
+        id=lead_id,
+        customer_name=f"Nasabah {lead_id}",
+        probability_score=score / 100,
+        score=score,
+        job=job,
+        loan_status=loan_status,
+    )
+
+
+def _reset(db):
+    db.query(models.Lead).delete()
+    db.query(models.LeadStatsRollup).delete()
+    db.commit()
+
+
+def test_stats_follow_inserts_and_rescoring(auth_client):
+    db = SessionLocal()
+    try:
+        _reset(db)
+        db.add_all([
+            _make_lead("S-1", 15, "admin.", "Has Loan"),
+            _make_lead("S-2", 85, "admin.", "No Loan"),
+            _make_lead("S-3", 100, "student", "No Loan"),
+        ])
+        db.commit()
+
+        body = auth_client.get("/leads/stats").json()
+        assert body["total_leads"] == 3
+        histogram = {b["bucket"]: b["count"] for b in body["score_histogram"]}
+        assert histogram["10-19"] == 1
+        assert histogram["80-89"] == 1
+        assert histogram["90-100"] == 1
+        jobs = {j["job"]: j for j in body["jobs"]}
+        assert jobs["admin."]["count"] == 2
+        assert abs(jobs["admin."]["avg_probability"] - 0.5) < 1e-9
+        loans = {l["loan_status"]: l["count"] for l in body["loan_status"]}
+        assert loans == {"Has Loan": 1, "No Loan": 2}
+
+        # Rescore an expired instance: the old bucket must be decremented
+        lead = db.get(models.Lead, "S-1")
+        lead.score = 95
+        lead.probability_score = 0.95
+        db.commit()
+
+        db.delete(db.get(models.Lead, "S-3"))
+        db.commit()
+
+        body = auth_client.get("/leads/stats").json()
+        assert body["total_leads"] == 2
+        histogram = {b["bucket"]: b["count"] for b in body["score_histogram"]}
+        assert histogram["10-19"] == 0
+        assert histogram["90-100"] == 1
+        assert [j["job"] for j in body["jobs"]] == ["admin."]
+    finally:
+        _reset(db)
+        db.close()
+
+
+def test_rebuild_matches_incremental():
+    db = SessionLocal()
+    try:
+        _reset(db)
+        db.add_all([_make_lead(f"R-{i}", i * 7, "services", "No Loan") for i in range(10)])
+        db.commit()
+        incremental = stats.get_lead_stats(db)
+
+        assert stats.rebuild_lead_stats(db) == 10
+        assert stats.get_lead_stats(db) == incremental
+    finally:
+        _reset(db)
+        db.close()
+
+
+def test_failed_flush_does_not_leak_deltas():
+    db = SessionLocal()
+    try:
+        _reset(db)
+        db.add(_make_lead("F-1", 40, "services", "No Loan"))
+        db.commit()
+
+        db.add(_make_lead("F-1", 40, "services", "No Loan"))
+        with pytest.raises(IntegrityError):
+            db.commit()
+        db.rollback()
+
+        db.add(_make_lead("F-2", 60, "services", "No Loan"))
+        db.commit()
+        assert stats.get_lead_stats(db)["total_leads"] == 2
+    finally:
+        _reset(db)
+        db.close()
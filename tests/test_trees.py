@@ -0,0 +1,62 @@
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+import pytest
+from app.inference import ModelService
+from app.trees import TreeEnsemble, export_from_model_dir
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+MODEL_DIR = os.path.join(PROJECT_ROOT, "models")
+BANK_CSV = os.path.join(PROJECT_ROOT, "ml", "dataset", "bank.csv")
+
+
+def _bank_matrix(columns):
+    pd = pytest.importorskip("pandas")
+    df = pd.read_csv(BANK_CSV, sep=";").drop(columns="y")
+    df = pd.get_dummies(df).reindex(columns=columns, fill_value=0)
+    return df.to_numpy(dtype=np.float32)
+
+
+def test_tree_evaluator_matches_xgboost_on_bank_csv():
+    pytest.importorskip("xgboost")
+    joblib = pytest.importorskip("joblib")
+    model = joblib.load(os.path.join(MODEL_DIR, "model_final_xgb.pkl"))
+    columns = joblib.load(os.path.join(MODEL_DIR, "model_columns.pkl"))
+
+    out_dir = tempfile.mkdtemp()
+    for name in ("model_final_xgb.pkl", "model_columns.pkl", "scaler.pkl"):
+        os.symlink(os.path.join(MODEL_DIR, name), os.path.join(out_dir, name))
+    path = export_from_model_dir(out_dir)
+    ensemble = TreeEnsemble.load(path)
+
+    X = ensemble.scale(_bank_matrix(columns))
+    expected = model.predict_proba(X)[:, 1]
+    actual = ensemble.predict_proba(X)[:, 1]
+    np.testing.assert_allclose(actual, expected, atol=1e-5)
+
+
+def test_committed_export_matches_xgboost_engine():
+    pytest.importorskip("xgboost")
+    xgb_service = ModelService(MODEL_DIR, engine="xgboost")
+    tree_service = ModelService(MODEL_DIR, engine="trees")
+    assert tree_service.get_model_info()["engine"] == "trees"
+    assert tree_service.expected_features == xgb_service.expected_features
+
+    for features in (
+        {"age": 40, "campaign": 2, "nr.employed": 5000, "job_student": 1},
+        {"age": 61, "euribor3m": 0.7, "poutcome_success": 1, "month_mar": 1},
+    ):
+        assert abs(tree_service.predict(features) - xgb_service.predict(features)) < 1e-5
+
+
+def test_tree_engine_without_export_falls_back_to_dummy():
+    service = ModelService(tempfile.mkdtemp(), engine="trees")
+    assert not service.is_model_loaded()
+    assert service.predict({"job": "admin"}) == 0.5
+
+
+def test_unknown_engine_rejected():
+    with pytest.raises(ValueError):
+        ModelService(MODEL_DIR, engine="onnx")